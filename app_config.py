@@ -0,0 +1,162 @@
+"""
+Configuration de l'application
+Lecture / écriture de advanced_rpc_config.json, surveillance des modifications
+"""
+
+import json
+import logging
+import math
+import os
+import stat
+import tempfile
+import threading
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'advanced_rpc_config.json'
+
+# Délai de regroupement des modifications avant écriture (secondes)
+SAVE_DEBOUNCE = 1.0
+
+# Intervalle de vérification du fichier par le watcher (secondes)
+WATCH_INTERVAL = 1.0
+
+# Droits d'un fichier de configuration créé par l'application
+CONFIG_FILE_MODE = 0o644
+
+DEFAULT_CONFIG = {
+    # RPC Config
+    'client_id': '',
+    'rpc_pipes': '',
+    'details': '',
+    'state': '',
+    'large_image': '',
+    'large_text': '',
+    'small_image': '',
+    'small_text': '',
+    'show_time': False,
+
+    # Profils de présence {nom: champs} et rotation
+    'presence_profiles': {},
+    'rotation_interval': 30,
+    'rotation_enabled': False,
+
+    # Bot Config (le token n'est jamais sauvegardé pour sécurité)
+    'bot_name': '',
+}
+
+
+def parse_rotation_interval(value):
+    """Durée de rotation en secondes (nombre ou texte saisi, virgule acceptée)
+
+    Lève ValueError si la durée n'est pas un nombre positif. Une durée entière
+    est rendue en int : "30" et 30 donnent la même valeur.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Durée de rotation invalide: {value!r}")
+    try:
+        interval = float(str(value).strip().replace(',', '.'))
+    except ValueError:
+        raise ValueError(f"Durée de rotation invalide: {value!r}") from None
+    if not math.isfinite(interval) or interval <= 0:
+        raise ValueError(f"Durée de rotation invalide: {value!r}")
+    return int(interval) if interval.is_integer() else interval
+
+
+@tracing.traced('config.load', 'io')
+def load_config(path=CONFIG_FILE):
+    """Charge la configuration (valeurs par défaut si le fichier est absent)"""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update(json.load(f))
+    try:
+        config['rotation_interval'] = parse_rotation_interval(config['rotation_interval'])
+    except ValueError as e:
+        logger.warning("%s, valeur par défaut utilisée", e)
+        config['rotation_interval'] = DEFAULT_CONFIG['rotation_interval']
+    return config
+
+
+@tracing.traced('config.save', 'io')
+def save_config(config, path=CONFIG_FILE):
+    """Sauvegarde la configuration (écriture atomique)
+
+    Le fichier est écrit à côté puis renommé : un plantage en cours
+    d'écriture laisse l'ancienne version intacte. Il garde les droits de
+    l'ancienne version (mkstemp crée le fichier temporaire en 0600).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = CONFIG_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.config-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def file_signature(path):
+    """Identifie une version du fichier (None s'il n'existe pas)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # L'inode change à chaque renommage atomique, même dans la même seconde
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ConfigWatcher:
+    """Recharge la configuration quand le fichier est modifié par un autre programme
+
+    Vérification périodique (stat) dans un thread de fond : portable et
+    sans dépendance. `callback(config)` est appelé depuis ce thread.
+    """
+
+    def __init__(self, callback, path=CONFIG_FILE, interval=WATCH_INTERVAL):
+        self.callback = callback
+        self.path = path
+        self.interval = interval
+        self.signature = file_signature(path)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def mark_saved(self):
+        """Ignore la version qui vient d'être écrite par l'application elle-même"""
+        self.signature = file_signature(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            signature = file_signature(self.path)
+            if signature == self.signature or signature is None:
+                continue
+            self.signature = signature
+            try:
+                config = load_config(self.path)
+            except (OSError, ValueError) as e:
+                # Fichier en cours d'écriture (non atomique) : la fin de
+                # l'écriture changera à nouveau la signature
+                logger.warning("Configuration illisible, ignorée: %s", e)
+                continue
+            try:
+                self.callback(config)
+            except Exception as e:
+                logger.error("Erreur rechargement config: %s", e)
@@ -0,0 +1,227 @@
+"""
+Liste virtualisée des assets
+Seules les lignes visibles sont dessinées, recherche par préfixe indexée
+"""
+
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+# Au-delà de ce nombre de modifications, l'index est retrié d'un bloc
+# (chaque insertion décale la liste : n insertions coûtent O(n²))
+REBUILD_THRESHOLD = 64
+
+
+class PrefixIndex:
+    """Index trié (nom, id) : recherche par préfixe en O(log n)"""
+
+    def __init__(self):
+        self.keys = []
+
+    @staticmethod
+    def _key(name):
+        return name.casefold()
+
+    def add(self, name, item_id):
+        bisect.insort(self.keys, (self._key(name), item_id))
+
+    def rebuild(self, entries):
+        """Remplace tout l'index à partir de (nom, id), en un seul tri"""
+        self.keys = sorted((self._key(name), item_id) for name, item_id in entries)
+
+    def remove(self, name, item_id):
+        key = (self._key(name), item_id)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def prefix_range(self, prefix):
+        """Bornes (début, fin) des entrées dont le nom commence par `prefix`"""
+        prefix = self._key(prefix)
+        if not prefix:
+            return 0, len(self.keys)
+        lo = bisect.bisect_left(self.keys, (prefix,))
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        hi = bisect.bisect_left(self.keys, (upper,), lo)
+        return lo, hi
+
+
+class VirtualAssetList(tk.Frame):
+    """Liste d'assets virtualisée (Canvas)
+
+    Un petit nombre de lignes graphiques est recyclé au défilement, quel
+    que soit le nombre d'assets. Les rafraîchissements appliquent des
+    différences (ajouts / suppressions) au lieu de tout reconstruire.
+    """
+
+    def __init__(self, parent, colors, thumbnail_cache=None, row_height=36,
+                 visible_rows=8, on_select=None, empty_text=""):
+        super().__init__(parent, bg=colors['card'])
+        self.colors = colors
+        self.thumbnail_cache = thumbnail_cache
+        self.row_height = row_height
+        self.on_select = on_select
+        self.empty_text = empty_text
+
+        self.items = {}
+        self.index = PrefixIndex()
+        self.query = ''
+        self.range = (0, 0)
+        self.top = 0
+        self.selected_id = None
+        self._rows = []
+
+        self.scrollbar = ttk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas = tk.Canvas(self, bg='#40444B', highlightthickness=0, bd=0,
+                                height=row_height * visible_rows)
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.empty_item = self.canvas.create_text(10, 10, anchor='nw', text="",
+                                                  fill=colors['text_muted'], font=('Segoe UI', 10))
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<Button-1>', self._on_click)
+
+    # =================== DONNÉES ===================
+
+    def set_items(self, records):
+        """Remplace le contenu en appliquant uniquement les différences"""
+        new_items = {record.id: record for record in records}
+        removed = [i for i in self.items if i not in new_items]
+        changed = [record for item_id, record in new_items.items() if self.items.get(item_id) != record]
+
+        if len(removed) + len(changed) > REBUILD_THRESHOLD:
+            # Premier chargement ou gros changement : un tri au lieu de n insertions
+            self.items = new_items
+            self.index.rebuild((record.name, item_id) for item_id, record in new_items.items())
+            if self.selected_id not in new_items:
+                self.selected_id = None
+        else:
+            for item_id in removed:
+                self._remove(item_id)
+            for record in changed:
+                self._remove(record.id)
+                self._add(record)
+        self._refresh()
+
+    def add_item(self, record):
+        self._add(record)
+        self._refresh()
+
+    def remove_item(self, item_id):
+        self._remove(item_id)
+        self._refresh()
+
+    def _add(self, record):
+        self.items[record.id] = record
+        self.index.add(record.name, record.id)
+
+    def _remove(self, item_id):
+        record = self.items.pop(item_id, None)
+        if record is not None:
+            self.index.remove(record.name, item_id)
+        if item_id == self.selected_id:
+            self.selected_id = None
+
+    def set_filter(self, query):
+        """Filtre par préfixe du nom"""
+        self.query = query.strip()
+        self.top = 0
+        self._refresh()
+
+    def _refresh(self):
+        self.range = self.index.prefix_range(self.query)
+        self.redraw()
+
+    def count(self):
+        """Nombre de lignes affichées (après filtre)"""
+        return self.range[1] - self.range[0]
+
+    def record_at(self, row):
+        return self.items[self.index.keys[self.range[0] + row][1]]
+
+    # =================== DÉFILEMENT ===================
+
+    def _max_top(self):
+        return max(0, self.count() * self.row_height - self.canvas.winfo_height())
+
+    def yview(self, *args):
+        """Interface compatible avec ttk.Scrollbar"""
+        total = max(1, self.count() * self.row_height)
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.row_height if args[2] == 'units' else self.canvas.winfo_height()
+            self.top += int(args[1]) * step
+        self.redraw()
+
+    def yview_scroll(self, number, what):
+        self.yview('scroll', number, what)
+
+    # =================== AFFICHAGE ===================
+
+    def redraw(self):
+        """Dessine uniquement les lignes visibles"""
+        height = max(1, self.canvas.winfo_height())
+        width = self.canvas.winfo_width()
+        self.top = min(max(0, self.top), self._max_top())
+
+        count = self.count()
+        first = self.top // self.row_height
+        last = min(count, (self.top + height) // self.row_height + 1)
+        visible = max(0, last - first)
+
+        # Recycler les lignes graphiques : on n'en crée que si besoin
+        while len(self._rows) < visible:
+            self._rows.append((
+                self.canvas.create_rectangle(0, 0, 0, 0, width=0),
+                self.canvas.create_image(0, 0, anchor='w'),
+                self.canvas.create_text(0, 0, anchor='w', fill=self.colors['text'],
+                                        font=('Segoe UI', 10)),
+            ))
+
+        for slot, (bg, image, text) in enumerate(self._rows):
+            if slot >= visible:
+                self.canvas.itemconfigure(bg, state='hidden')
+                self.canvas.itemconfigure(image, state='hidden')
+                self.canvas.itemconfigure(text, state='hidden')
+                continue
+
+            row = first + slot
+            record = self.record_at(row)
+            y = row * self.row_height - self.top
+            selected = record.id == self.selected_id
+            self.canvas.coords(bg, 0, y, width, y + self.row_height)
+            self.canvas.itemconfigure(bg, state='normal',
+                                      fill=self.colors['accent'] if selected else '#40444B')
+            self.canvas.coords(image, 6, y + self.row_height // 2)
+            self.canvas.itemconfigure(image, state='normal', image=self._thumbnail(record))
+            self.canvas.coords(text, self.row_height + 8, y + self.row_height // 2)
+            self.canvas.itemconfigure(text, state='normal', text=f"📁 {record.name}")
+
+        self.canvas.itemconfigure(self.empty_item, text="" if count else self.empty_text)
+
+        total = count * self.row_height
+        if total <= height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + height) / total)
+
+    def _thumbnail(self, record):
+        """Miniature si disponible, sinon demande asynchrone"""
+        if not self.thumbnail_cache or not record.content_hash:
+            return ''
+        image = self.thumbnail_cache.get_cached(record.content_hash)
+        if image is not None:
+            return image
+        self.thumbnail_cache.request(record.content_hash, record.local_path, lambda img: self.redraw())
+        return ''
+
+    def _on_click(self, event):
+        row = (self.top + event.y) // self.row_height
+        if row >= self.count():
+            return
+        self.selected_id = self.record_at(row).id
+        self.redraw()
+        if self.on_select:
+            self.on_select(self.selected_id)
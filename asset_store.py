@@ -0,0 +1,271 @@
+"""
+Index local des assets
+Base SQLite indexée par id et par nom, remplace local_assets.json
+
+Les images sont stockées une seule fois dans assets/ sous le nom de leur
+empreinte SHA-256 : plusieurs assets peuvent partager le même fichier.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+import tracing
+
+ASSETS_DB = 'local_assets.db'
+ASSETS_DIR = 'assets'
+LEGACY_ASSETS_FILE = 'local_assets.json'
+
+# Taille des blocs lus pour le hachage / la copie
+CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    local_path TEXT NOT NULL,
+    original_path TEXT,
+    created_at TEXT NOT NULL,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS assets_name ON assets (name);
+"""
+
+COLUMNS = 'id, name, local_path, original_path, created_at, content_hash'
+
+
+def hash_file(path):
+    """Empreinte SHA-256 d'un fichier, lue par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_to_temp(source_path, assets_dir):
+    """Copie le fichier dans assets_dir en le hachant au fil de l'eau
+
+    Retourne (copie temporaire, empreinte). N'utilise pas la base : peut
+    tourner dans un autre processus.
+    """
+    os.makedirs(assets_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=assets_dir, suffix='.tmp')
+    try:
+        with open(source_path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                dst.write(chunk)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+
+class AssetRecord(collections.namedtuple('AssetRecord', COLUMNS)):
+    """Asset local (enregistrement compact et immuable)"""
+
+    __slots__ = ()
+
+
+class AssetStore:
+    """Index des assets locaux stocké dans SQLite
+
+    Chaque ajout / suppression est une transaction : plus de relecture ni
+    de réécriture complète du fichier. Les noms pointent vers des fichiers
+    partagés (un par contenu distinct).
+
+    Le verrou couvre aussi les fichiers partagés : un fichier est rangé et
+    référencé (INSERT), ou déréférencé et supprimé, sans qu'un autre thread
+    puisse s'intercaler. Seule la copie (hachage) se fait hors du verrou.
+    """
+
+    def __init__(self, db_path=ASSETS_DB, assets_dir=ASSETS_DIR, legacy_file=LEGACY_ASSETS_FILE):
+        self.assets_dir = assets_dir
+        # Réentrant : les méthodes de fichiers partagés s'appellent sous le verrou
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.upgrade_schema()
+        self.migrate_legacy(legacy_file)
+        self.deduplicate()
+
+    def upgrade_schema(self):
+        """Ajoute les colonnes des versions récentes à une base existante"""
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(assets)')]
+        with self._lock, self.conn:
+            if 'content_hash' not in columns:
+                self.conn.execute('ALTER TABLE assets ADD COLUMN content_hash TEXT')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS assets_content_hash ON assets (content_hash)')
+
+    def migrate_legacy(self, legacy_file):
+        """Importe l'ancien local_assets.json (une seule fois)"""
+        if not legacy_file or not os.path.exists(legacy_file):
+            return
+
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            legacy_assets = json.load(f)
+
+        rows = [(a.get('id') or str(uuid.uuid4()), a['name'], a['local_path'],
+                 a.get('original_path'), a.get('created_at') or time.strftime('%Y-%m-%d %H:%M:%S'), None)
+                for a in legacy_assets]
+        with self._lock, self.conn:
+            self.conn.executemany(f'INSERT OR IGNORE INTO assets ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+        # Conserver l'ancien fichier en sauvegarde
+        os.replace(legacy_file, legacy_file + '.bak')
+
+    def deduplicate(self):
+        """Range les anciens fichiers (sans empreinte) dans le stockage par contenu"""
+        with self._lock:
+            rows = self.conn.execute('SELECT id, local_path FROM assets WHERE content_hash IS NULL').fetchall()
+
+        for asset_id, local_path in rows:
+            if not os.path.exists(local_path):
+                continue
+            content_hash = hash_file(local_path)
+            with self._lock, self.conn:
+                blob_path = self.blob_path(content_hash, local_path)
+                if os.path.exists(blob_path):
+                    os.remove(local_path)
+                else:
+                    os.replace(local_path, blob_path)
+                self.conn.execute('UPDATE assets SET local_path = ?, content_hash = ? WHERE id = ?',
+                                  (blob_path, content_hash, asset_id))
+
+    def blob_path(self, content_hash, source_path):
+        """Chemin du fichier partagé pour une empreinte donnée"""
+        with self._lock:
+            row = self.conn.execute('SELECT local_path FROM assets WHERE content_hash = ? LIMIT 1',
+                                    (content_hash,)).fetchone()
+        if row:
+            return row[0]
+        ext = os.path.splitext(source_path)[1].lower()
+        return os.path.join(self.assets_dir, f"{content_hash}{ext}")
+
+    def place_blob(self, tmp_path, content_hash, source_path):
+        """Range une copie temporaire sous son empreinte, retourne le chemin partagé
+
+        Si le contenu est déjà présent, la copie temporaire est abandonnée.
+        À appeler sous le verrou, jusqu'à l'INSERT qui référence le fichier.
+        """
+        with self._lock:
+            blob_path = self.blob_path(content_hash, source_path)
+            if os.path.exists(blob_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, blob_path)
+            return blob_path
+
+    @tracing.traced('assets.add', 'io')
+    def add(self, name, source_path):
+        """Ajoute une image à l'index (fichier partagé si déjà connu)"""
+        with tracing.span('assets.copy', 'io'):
+            tmp_path, content_hash = copy_to_temp(source_path, self.assets_dir)
+
+        with self._lock:
+            try:
+                local_path = self.place_blob(tmp_path, content_hash, source_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            record = AssetRecord(str(uuid.uuid4()), name, local_path, source_path,
+                                 time.strftime('%Y-%m-%d %H:%M:%S'), content_hash)
+            try:
+                with self.conn:
+                    self.conn.execute(f'INSERT INTO assets ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)', record)
+            except Exception:
+                self.release_blob(local_path)
+                raise
+        return record
+
+    @tracing.traced('assets.add_many', 'io')
+    def add_many(self, items):
+        """Ajoute un lot d'images déjà copiées, en une seule transaction
+
+        `items` : tuples (nom, chemin source, copie temporaire, empreinte)
+        produits par `copy_to_temp`. Retourne les enregistrements créés.
+        """
+        created_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        placed = {}
+        records = []
+        with self._lock:
+            try:
+                for name, source_path, tmp_path, content_hash in items:
+                    local_path = placed.get(content_hash)
+                    if local_path is None:
+                        local_path = placed[content_hash] = self.place_blob(tmp_path, content_hash, source_path)
+                    else:
+                        # Doublon à l'intérieur du lot
+                        os.remove(tmp_path)
+                    records.append(AssetRecord(str(uuid.uuid4()), name, local_path, source_path,
+                                               created_at, content_hash))
+
+                with self.conn:
+                    self.conn.executemany(f'INSERT INTO assets ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)', records)
+            except Exception:
+                for _, _, tmp_path, _ in items:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                for local_path in placed.values():
+                    self.release_blob(local_path)
+                raise
+        return records
+
+    def release_blob(self, local_path):
+        """Supprime le fichier s'il n'est plus référencé par aucun asset"""
+        with self._lock:
+            row = self.conn.execute('SELECT 1 FROM assets WHERE local_path = ? LIMIT 1',
+                                    (local_path,)).fetchone()
+            if row is None and os.path.exists(local_path):
+                os.remove(local_path)
+
+    def get(self, asset_id):
+        """Asset par id (ou None)"""
+        with self._lock:
+            row = self.conn.execute(f'SELECT {COLUMNS} FROM assets WHERE id = ?', (asset_id,)).fetchone()
+        return AssetRecord(*row) if row else None
+
+    def find_by_name(self, name):
+        """Assets portant ce nom"""
+        with self._lock:
+            rows = self.conn.execute(f'SELECT {COLUMNS} FROM assets WHERE name = ? ORDER BY rowid',
+                                     (name,)).fetchall()
+        return [AssetRecord(*row) for row in rows]
+
+    def list(self):
+        """Tous les assets, dans l'ordre d'ajout"""
+        with self._lock:
+            rows = self.conn.execute(f'SELECT {COLUMNS} FROM assets ORDER BY rowid').fetchall()
+        return [AssetRecord(*row) for row in rows]
+
+    @tracing.traced('assets.delete', 'io')
+    def delete(self, asset_id):
+        """Supprime un asset et son fichier, retourne l'enregistrement supprimé"""
+        with self._lock:
+            record = self.get(asset_id)
+            if record is None:
+                return None
+
+            with self.conn:
+                self.conn.execute('DELETE FROM assets WHERE id = ?', (asset_id,))
+
+            # Le fichier peut être partagé avec d'autres assets
+            self.release_blob(record.local_path)
+        return record
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,68 @@
+"""
+Préparation des avatars du bot
+Redimensionnement et recompression avant envoi à l'API Discord
+"""
+
+import base64
+import io
+import os
+
+from PIL import Image, ImageOps
+
+# Résolution maximale utile pour une icône d'application Discord
+AVATAR_MAX_SIZE = 1024
+JPEG_QUALITY = 90
+
+# Formats sans perte : probablement des logos, on reste en PNG
+LOSSLESS_FORMATS = ('PNG', 'GIF', 'BMP', 'TIFF')
+
+
+def has_alpha(img):
+    """Indique si l'image contient de la transparence"""
+    return img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def encode_avatar(path, max_size=AVATAR_MAX_SIZE):
+    """Retourne (type MIME, données) de l'avatar redimensionné et recompressé"""
+    with Image.open(path) as img:
+        source_format = img.format
+        source_mime = Image.MIME.get(source_format, 'image/png')
+
+        # Les GIF animés sont envoyés tels quels
+        if getattr(img, 'is_animated', False):
+            return source_mime, read_file(path)
+
+        # JPEG : décodage directement à une résolution réduite
+        img.draft('RGB', (max_size, max_size))
+        img = ImageOps.exif_transpose(img)
+
+        resized = max(img.size) > max_size
+        if resized:
+            img.thumbnail((max_size, max_size), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if has_alpha(img) or source_format in LOSSLESS_FORMATS:
+            mime_type = 'image/png'
+            img.convert('RGBA' if has_alpha(img) else 'RGB').save(buffer, 'PNG', optimize=True)
+        else:
+            mime_type = 'image/jpeg'
+            img.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY,
+                                    optimize=True, progressive=True)
+
+    # Une image déjà petite et bien compressée est gardée telle quelle
+    if not resized and os.path.getsize(path) <= buffer.tell():
+        return source_mime, read_file(path)
+
+    # Vue sur le buffer : pas de copie supplémentaire avant l'encodage base64
+    return mime_type, buffer.getbuffer()
+
+
+def build_avatar_data_uri(path, max_size=AVATAR_MAX_SIZE):
+    """Construit le data URI base64 de l'avatar optimisé"""
+    mime_type, data = encode_avatar(path, max_size)
+    return f"data:{mime_type};base64," + base64.b64encode(data).decode('ascii')
@@ -0,0 +1,167 @@
+"""
+Benchmark du Bot Manager
+Workflows REST de l'interface (identité, nom, avatar, assets) contre une
+API Discord factice locale, sans réseau
+
+Usage :
+    python bench_bot_api.py [--ops N] [--concurrency C] [--latency MS] [--limit 5/1] [--json FICHIER]
+
+Workflows :
+    get_application_id  identité de l'application (en cache après le premier appel)
+    change_bot_name     identité + PATCH du nom
+    change_bot_avatar   identité + redimensionnement de l'image + PATCH de l'icône
+    load_assets         informations de l'application (onglet Assets)
+
+--fresh-client recrée le client à chaque opération (ni keep-alive ni cache) :
+la comparaison avec le mode par défaut chiffre la réutilisation des connexions
+et le cache d'identité.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import format_line, summarize
+from discord_api import DiscordBotClient
+from mock_discord_api import MockDiscordAPI, parse_limit
+
+TOKEN = 'bench.token'
+WORKFLOWS = ('get_application_id', 'change_bot_name', 'change_bot_avatar', 'load_assets')
+
+
+def make_avatar(directory, size):
+    """Image de bruit (incompressible) : le pire cas pour l'envoi d'un avatar"""
+    from PIL import Image
+
+    channels = [Image.effect_noise((size, size), 64) for _ in range(3)]
+    path = os.path.join(directory, f'avatar_{size}.png')
+    Image.merge('RGB', channels).save(path, 'PNG')
+    return path
+
+
+def run_workflow(name, client, avatar_path, i):
+    """Une opération de l'interface, appels REST compris"""
+    if name == 'load_assets':
+        return client.get_application(client.get_current_application()['id'])
+
+    app_id = client.get_current_application()['id']
+    if name == 'change_bot_name':
+        client.edit_application(app_id, name=f'Bench Bot {i}')
+    elif name == 'change_bot_avatar':
+        from avatar_pipeline import build_avatar_data_uri
+        client.edit_application(app_id, icon=build_avatar_data_uri(avatar_path))
+    return app_id
+
+
+def bench_workflow(api, name, ops, concurrency, fresh_client, avatar_path):
+    """Lance `ops` fois le workflow sur `concurrency` workers (comme l'interface)"""
+    shared = DiscordBotClient(TOKEN, api_base=api.api_base)
+    # Identité déjà connue, comme après la première action de l'utilisateur
+    if name != 'get_application_id' and not fresh_client:
+        shared.get_current_application()
+    api.reset_stats()
+
+    latencies = []
+    errors = []
+
+    def operation(i):
+        client = DiscordBotClient(TOKEN, api_base=api.api_base) if fresh_client else shared
+        start = time.perf_counter()
+        try:
+            run_workflow(name, client, avatar_path, i)
+        except Exception as e:
+            errors.append(str(e))
+        else:
+            latencies.append(time.perf_counter() - start)
+        finally:
+            if fresh_client:
+                client.session.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bench-worker') as executor:
+        list(executor.map(operation, range(ops)))
+    elapsed = time.perf_counter() - start
+    shared.session.close()
+
+    result = summarize(latencies)
+    result.update({
+        'ops_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'errors': len(errors),
+        'http_requests': api.stats['requests'],
+        'http_429': api.stats['throttled'],
+        'connections': api.stats['connections'],
+        'bytes_sent': api.stats['bytes_in'],
+    })
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def print_results(results):
+    for name, stats in results.items():
+        print(format_line(name, stats))
+        line = (f"{'':<18} {stats['http_requests']} requêtes HTTP, {stats['http_429']} 429, "
+                f"{stats['connections']} connexions, {stats['bytes_sent'] / 1024:.0f} Kio envoyés")
+        if stats['errors']:
+            line += f" - {stats['errors']} ERREURS ({stats['first_error']})"
+        print(line)
+
+
+def main(argv=None):
+    """Lance les workflows et affiche (ou enregistre) les résultats"""
+    parser = argparse.ArgumentParser(description="Benchmark du Bot Manager contre une API Discord factice")
+    parser.add_argument('--workflow', action='append', choices=WORKFLOWS,
+                        help="workflow à lancer (répétable, défaut: tous)")
+    parser.add_argument('--ops', type=int, default=50, help="opérations par workflow (défaut: %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="workers en parallèle, comme le pool de l'interface (défaut: %(default)s)")
+    parser.add_argument('--fresh-client', action='store_true',
+                        help="nouveau client (et connexion) à chaque opération")
+    parser.add_argument('--latency', type=float, default=0.0, help="latence de l'API, en millisecondes")
+    parser.add_argument('--limit', type=parse_limit, default='1000/1',
+                        help="quota par route de l'API, annoncé par les en-têtes X-RateLimit-* (défaut: %(default)s)")
+    parser.add_argument('--throttle-every', type=int, default=0, help="une requête sur N reçoit un 429")
+    parser.add_argument('--retry-after', type=float, default=0.05,
+                        help="retry_after des 429 injectés (défaut: %(default)s s)")
+    parser.add_argument('--avatar-size', type=int, default=2048,
+                        help="côté de l'image d'avatar envoyée, en pixels (défaut: %(default)s)")
+    parser.add_argument('--json', metavar='FICHIER', help="enregistre les résultats en JSON")
+    parser.add_argument('-v', '--verbose', action='store_true', help="affiche les messages de debug")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    workflows = args.workflow or WORKFLOWS
+    limit, window = args.limit
+    api = MockDiscordAPI(latency=args.latency / 1000, limit=limit, window=window,
+                         throttle_every=args.throttle_every, retry_after=args.retry_after)
+    api.start()
+    directory = tempfile.mkdtemp(prefix='bench-api-')
+
+    results = {}
+    try:
+        avatar_path = make_avatar(directory, args.avatar_size) if 'change_bot_avatar' in workflows else None
+        for name in workflows:
+            results[name] = bench_workflow(api, name, args.ops, args.concurrency,
+                                           args.fresh_client, avatar_path)
+    finally:
+        api.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if any(stats['errors'] for stats in results.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Outils communs aux benchmarks
+Statistiques de latence et mise en forme des résultats
+"""
+
+import math
+
+
+def percentile(values, pct):
+    """Percentile (rang le plus proche) d'une série de mesures"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies):
+    """Statistiques d'une série de durées (secondes), en millisecondes"""
+    return {
+        'n': len(latencies),
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def format_line(name, stats):
+    """Ligne de rapport : percentiles et débit éventuel"""
+    line = (f"{name:<18} n={stats['n']:<6} p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  "
+            f"p99 {stats['p99_ms']:8.3f} ms  max {stats['max_ms']:8.3f} ms")
+    if 'updates_per_s' in stats:
+        line += f"  {stats['updates_per_s']:10.1f} maj/s"
+    elif 'ops_per_s' in stats:
+        line += f"  {stats['ops_per_s']:10.1f} op/s"
+    return line
@@ -0,0 +1,223 @@
+"""
+Benchmark de la Rich Presence
+Connexion, mises à jour et débit du moteur contre un faux Discord local
+(socket Unix), sans réseau ni client Discord
+
+Usage :
+    python bench_presence.py [--updates N] [--rate R] [--unthrottled] [--json FICHIER]
+
+Scénarios :
+    connect  connexion + handshake du moteur (puis déconnexion), N fois
+    ipc      aller-retour SET_ACTIVITY du client IPC, séquentiel puis en pipeline
+    engine   publish() à R mises à jour/s jusqu'à la réception par Discord
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_common import format_line, summarize
+from discord_ipc import AsyncDiscordIPC, EventLoopThread
+from fake_discord_ipc import FakeDiscordServer
+from presence_engine import PresenceEngine, PresenceModel, PresenceSnapshot, RateLimiter
+
+CLIENT_ID = '123456789012345678'
+SCENARIOS = ('connect', 'ipc', 'engine')
+
+
+def bench_connect(server, iterations):
+    """Durée de connect() (socket + handshake) du moteur"""
+    engine = PresenceEngine()
+    # Chaque connexion renvoie la présence : pas de quota entre deux mesures
+    engine.pusher.rate_limiter = RateLimiter(period=0.0)
+    engine.start()
+    latencies = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            engine.connect(CLIENT_ID, 0).result()
+            latencies.append(time.perf_counter() - start)
+            # Laisser passer le renvoi de la présence avant de fermer
+            server.wait_for(lambda: engine.model.last_sent_hash is not None, 5.0)
+            engine.disconnect().result()
+    finally:
+        engine.stop()
+    return summarize(latencies)
+
+
+def bench_ipc(server, updates, concurrency):
+    """Aller-retour SET_ACTIVITY du client IPC, hors moteur (ni regroupement ni quota)"""
+    loop_thread = EventLoopThread(name='bench-ipc')
+    loop_thread.start()
+
+    async def run():
+        client = AsyncDiscordIPC(CLIENT_ID, 0)
+        await client.connect()
+        try:
+            sequential = []
+            for i in range(updates):
+                start = time.perf_counter()
+                await client.set_activity({'details': f'ipc {i}'})
+                sequential.append(time.perf_counter() - start)
+
+            # Pipeline : `concurrency` commandes en vol en même temps
+            semaphore = asyncio.Semaphore(concurrency)
+            pipelined = []
+
+            async def send(i):
+                async with semaphore:
+                    start = time.perf_counter()
+                    await client.set_activity({'details': f'pipeline {i}'})
+                    pipelined.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(send(i) for i in range(updates)))
+            elapsed = time.perf_counter() - start
+            return sequential, pipelined, elapsed
+        finally:
+            await client.close()
+
+    try:
+        sequential, pipelined, elapsed = loop_thread.submit(run()).result()
+    finally:
+        loop_thread.stop()
+
+    result = summarize(sequential)
+    result['updates_per_s'] = len(sequential) / sum(sequential) if sequential else 0.0
+    result['pipelined'] = summarize(pipelined)
+    result['pipelined']['concurrency'] = concurrency
+    result['pipelined']['updates_per_s'] = len(pipelined) / elapsed if elapsed else 0.0
+    return result
+
+
+def bench_engine(server, updates, rate, unthrottled, timeout):
+    """publish() jusqu'à la réception par Discord, au rythme de `rate` mises à jour/s"""
+    engine = PresenceEngine()
+    if unthrottled:
+        # Mesure du pipeline seul : ni regroupement de saisie ni quota Discord
+        engine.pusher.debounce = 0.0
+        engine.pusher.rate_limiter = RateLimiter(period=0.0)
+    engine.start()
+    engine.connect(CLIENT_ID, 0).result()
+    server.wait_for(lambda: engine.model.last_sent_hash is not None, timeout)
+    server.clear()
+
+    published = {}
+    interval = 1.0 / rate if rate else 0.0
+    fields = {'state': 'benchmark'}
+    # Empreinte de la dernière valeur : connue du moteur une fois acquittée par Discord
+    last_hash = PresenceModel.payload_hash(dict(fields, details=f'bench {updates - 1}'))
+    try:
+        start = time.perf_counter()
+        for i in range(updates):
+            if interval:
+                delay = start + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            details = f'bench {i}'
+            published[details] = time.perf_counter()
+            engine.publish(PresenceSnapshot.from_dict(dict(fields, details=details)))
+        publish_elapsed = time.perf_counter() - start
+
+        # La dernière valeur doit toujours finir par être envoyée
+        delivered = server.wait_for(lambda: engine.model.last_sent_hash == last_hash, timeout)
+    finally:
+        engine.disconnect().result()
+        engine.stop()
+
+    received = [(at, activity['details']) for at, activity in server.received
+                if activity and activity.get('details') in published]
+    latencies = [at - published[details] for at, details in received]
+    elapsed = received[-1][0] - start if received else 0.0
+
+    result = summarize(latencies)
+    result.update({
+        'published': updates,
+        'publish_per_s': updates / publish_elapsed if publish_elapsed else 0.0,
+        'sent': len(received),
+        'coalesced': updates - len(received),
+        'updates_per_s': len(received) / elapsed if elapsed else 0.0,
+        'last_delivered': delivered,
+        'throttled': not unthrottled,
+    })
+    return result
+
+
+def print_results(results):
+    if 'connect' in results:
+        print(format_line('connect', results['connect']))
+    if 'ipc' in results:
+        print(format_line('ipc (séquentiel)', results['ipc']))
+        pipelined = results['ipc']['pipelined']
+        print(format_line(f"ipc (x{pipelined['concurrency']})", pipelined))
+    if 'engine' in results:
+        engine = results['engine']
+        print(format_line('engine', engine))
+        print(f"{'':<18} {engine['published']} publiées ({engine['publish_per_s']:.0f}/s), "
+              f"{engine['sent']} envoyées, {engine['coalesced']} regroupées"
+              + ("" if engine['throttled'] else " (sans quota)")
+              + ("" if engine['last_delivered'] else " - DERNIÈRE VALEUR NON REÇUE"))
+
+
+def main(argv=None):
+    """Lance les scénarios et affiche (ou enregistre) les résultats"""
+    parser = argparse.ArgumentParser(description="Benchmark de la Rich Presence contre un faux Discord local")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help="scénario à lancer (répétable, défaut: tous)")
+    parser.add_argument('--connects', type=int, default=50, help="connexions mesurées (défaut: %(default)s)")
+    parser.add_argument('--updates', type=int, default=500, help="mises à jour par scénario (défaut: %(default)s)")
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="mises à jour publiées par seconde (défaut: au plus vite)")
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="commandes IPC en vol en mode pipeline (défaut: %(default)s)")
+    parser.add_argument('--unthrottled', action='store_true',
+                        help="désactive le regroupement et le quota Discord (5 mises à jour / 20 s) du moteur")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="délai de réponse du faux Discord, en millisecondes")
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help="attente maximum de la dernière mise à jour (défaut: %(default)s s)")
+    parser.add_argument('--json', metavar='FICHIER', help="enregistre les résultats en JSON")
+    parser.add_argument('-v', '--verbose', action='store_true', help="affiche les messages de debug")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    # Le client cherche le socket dans XDG_RUNTIME_DIR
+    directory = tempfile.mkdtemp(prefix='bench-ipc-')
+    os.environ['XDG_RUNTIME_DIR'] = directory
+    server = FakeDiscordServer(directory, 0, args.latency / 1000)
+    server.start()
+
+    results = {}
+    try:
+        for scenario in args.scenario or SCENARIOS:
+            server.clear()
+            if scenario == 'connect':
+                results[scenario] = bench_connect(server, args.connects)
+            elif scenario == 'ipc':
+                results[scenario] = bench_ipc(server, args.updates, args.concurrency)
+            else:
+                results[scenario] = bench_engine(server, args.updates, args.rate,
+                                                 args.unthrottled, args.timeout)
+    finally:
+        server.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    engine = results.get('engine')
+    return 1 if engine and not engine['last_delivered'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Import en masse d'assets
+Validation, hachage, copie et miniatures en parallèle (processus), puis
+insertion dans l'index en une seule transaction
+
+Usage :
+    python bulk_import.py DOSSIER_OU_MOTIF [-j N]
+"""
+
+import argparse
+import collections
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image
+
+from asset_store import ASSETS_DB, ASSETS_DIR, AssetStore, copy_to_temp
+from thumbnails import THUMBNAIL_DIR, THUMBNAIL_SIZE, render_thumbnail, thumbnail_path
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+IMAGE_FORMATS = ('PNG', 'JPEG', 'GIF', 'WEBP')
+
+# Même limite que l'ajout unitaire
+MAX_FILE_SIZE = 8 * 1024 * 1024
+
+# Intervalle minimum entre deux rapports de progression (secondes)
+PROGRESS_INTERVAL = 0.1
+
+ImportReport = collections.namedtuple('ImportReport', 'records errors elapsed')
+
+
+def find_images(source):
+    """Images d'un dossier (récursif) ou correspondant à un motif glob"""
+    if os.path.isdir(source):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            # Ne pas réimporter le stockage et les miniatures
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            paths.extend(os.path.join(root, f) for f in files)
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(p for p in paths
+                  if os.path.isfile(p) and os.path.splitext(p)[1].lower() in IMAGE_EXTENSIONS)
+
+
+def prepare_image(source_path, assets_dir, thumbnail_dir, thumbnail_size):
+    """Valide, copie, hache et génère la miniature d'une image (processus worker)
+
+    Retourne (copie temporaire, empreinte). Aucune écriture dans la base.
+    """
+    if os.path.getsize(source_path) > MAX_FILE_SIZE:
+        raise ValueError(f"image trop grande (maximum {MAX_FILE_SIZE // (1024 * 1024)}MB)")
+    with Image.open(source_path) as img:
+        if img.format not in IMAGE_FORMATS:
+            raise ValueError(f"format non supporté ({img.format})")
+
+    tmp_path, content_hash = copy_to_temp(source_path, assets_dir)
+    try:
+        thumb = thumbnail_path(thumbnail_dir, content_hash, thumbnail_size)
+        if not os.path.exists(thumb):
+            os.makedirs(thumbnail_dir, exist_ok=True)
+            render_thumbnail(tmp_path, thumb, thumbnail_size)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, content_hash
+
+
+def import_images(store, source, progress=None, max_workers=None,
+                  thumbnail_dir=THUMBNAIL_DIR, thumbnail_size=THUMBNAIL_SIZE):
+    """Importe toutes les images de `source` dans `store`
+
+    `progress(traitées, total)` est appelé depuis le thread appelant.
+    Les fichiers invalides sont ignorés et listés dans le rapport.
+    """
+    start = time.perf_counter()
+    paths = find_images(source)
+    total = len(paths)
+    prepared = []
+    errors = []
+    if progress:
+        progress(0, total)
+
+    if paths:
+        # spawn : pas de fork d'un processus qui contient des threads (Tk, asyncio)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = {executor.submit(prepare_image, path, store.assets_dir,
+                                       thumbnail_dir, thumbnail_size): path
+                       for path in paths}
+            last_report = 0.0
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                try:
+                    tmp_path, content_hash = future.result()
+                except Exception as e:
+                    errors.append((path, str(e)))
+                else:
+                    name = os.path.splitext(os.path.basename(path))[0]
+                    prepared.append((name, path, tmp_path, content_hash))
+
+                now = time.perf_counter()
+                if progress and (done == total or now - last_report >= PROGRESS_INTERVAL):
+                    last_report = now
+                    progress(done, total)
+
+    # Ordre stable (celui des fichiers) quel que soit l'ordre de fin des workers
+    order = {path: i for i, path in enumerate(paths)}
+    prepared.sort(key=lambda item: order[item[1]])
+    records = store.add_many(prepared)
+    return ImportReport(records, errors, time.perf_counter() - start)
+
+
+def main(argv=None):
+    """Import en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Importe un dossier d'images dans les assets locaux")
+    parser.add_argument('source', help="dossier ou motif glob (ex: 'pack/**/*.png')")
+    parser.add_argument('-j', '--jobs', type=int, help="nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument('--db', default=ASSETS_DB, help="index des assets (défaut: %(default)s)")
+    parser.add_argument('--assets-dir', default=ASSETS_DIR, help="stockage des images (défaut: %(default)s)")
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end='', file=sys.stderr, flush=True)
+
+    store = AssetStore(args.db, args.assets_dir)
+    try:
+        report = import_images(store, args.source, progress, args.jobs,
+                               thumbnail_dir=os.path.join(args.assets_dir, '.thumbnails'))
+    finally:
+        store.close()
+    print(file=sys.stderr)
+
+    for path, error in report.errors:
+        print(f"Ignoré {path}: {error}", file=sys.stderr)
+    print(f"{len(report.records)} assets importés en {report.elapsed:.1f}s "
+          f"({len(report.errors)} erreurs)")
+    return 0 if report.records or not report.errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
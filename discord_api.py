@@ -0,0 +1,331 @@
+"""
+Client REST Discord pour le Bot Manager
+Appels à l'API Discord, sans interface graphique
+"""
+
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import metrics
+import tracing
+
+# Remplaçable (ex: API factice locale des benchmarks)
+API_BASE = os.environ.get('DISCORD_API_BASE', 'https://discord.com/api/v10')
+
+# Durée de validité de l'identité de l'application en cache (secondes)
+IDENTITY_TTL = 300.0
+
+# Nouvelles tentatives maximum après une réponse 429
+MAX_RETRIES = 3
+
+# Paramètres majeurs : ils séparent les buckets d'une même route
+MAJOR_PARAMETERS = ('channels', 'guilds', 'webhooks')
+SNOWFLAKE = re.compile(r'^\d+$')
+
+# Métriques (voir metrics.MetricsServer)
+REST_REQUESTS = metrics.counter('discord_rest_requests_total', "Appels REST par route et code HTTP",
+                                ('route', 'status'))
+REST_LATENCY = metrics.histogram('discord_rest_request_seconds', "Durée des appels REST", ('route',))
+REST_RATE_LIMIT_WAIT = metrics.counter('discord_rest_rate_limit_wait_seconds_total',
+                                       "Temps passé à attendre le quota d'une route", ('route',))
+
+
+class DiscordAPIError(Exception):
+    """Réponse d'erreur de l'API Discord"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def route_key(method, url):
+    """Clé de route : méthode + chemin, ids non majeurs remplacés par :id"""
+    parts = urlsplit(url).path.split('/')
+    for i, part in enumerate(parts):
+        if SNOWFLAKE.match(part) and (i == 0 or parts[i - 1] not in MAJOR_PARAMETERS):
+            parts[i] = ':id'
+    return f"{method.upper()} {'/'.join(parts)}"
+
+
+class RateLimitBucket:
+    """État d'un bucket de limitation Discord
+
+    `remaining` / `reset_at` suivent la fenêtre annoncée par les headers ;
+    un 429 ne fait que suspendre le bucket jusqu'à `retry_until`, sans
+    toucher à la fenêtre (une réponse 200 concurrente la mettrait à jour).
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+        self.retry_until = 0.0
+        self.inflight = 0
+
+    def delay(self, now):
+        """Temps d'attente avant de pouvoir envoyer (None : attendre une réponse)"""
+        if self.retry_until > now:
+            return self.retry_until - now
+
+        if self.reset_at and now >= self.reset_at:
+            # Fenêtre écoulée : le quota est reconstitué
+            self.remaining = self.limit
+            self.reset_at = 0.0
+
+        if self.limit is None:
+            # Limites inconnues : une seule requête tant qu'aucune réponse n'est arrivée
+            return None if self.inflight else 0.0
+        if self.remaining is not None and self.remaining <= 0:
+            if self.reset_at:
+                return self.reset_at - now
+            return None if self.inflight else 0.0
+        return 0.0
+
+    def update(self, headers, now):
+        """Met à jour le bucket à partir des headers X-RateLimit-*
+
+        Les réponses de requêtes parallèles arrivent dans le désordre : dans
+        la fenêtre en cours, `remaining` ne peut que baisser, sinon une
+        réponse ancienne rendrait du quota déjà consommé (et provoquerait des 429).
+        """
+        limit = headers.get('X-RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        if limit is None or remaining is None:
+            return
+        self.limit = int(limit)
+        # Les requêtes encore en vol ne sont peut-être pas comptées par Discord
+        remaining = max(0, int(remaining) - self.inflight)
+        if self.reset_at and now < self.reset_at and self.remaining is not None:
+            remaining = min(self.remaining, remaining)
+        self.remaining = remaining
+        if reset_after is not None:
+            self.reset_at = now + float(reset_after)
+
+
+class RateLimitedSession:
+    """Enveloppe une requests.Session avec les rate limits Discord
+
+    Les requêtes d'un bucket épuisé attendent (file d'attente) la fin de
+    la fenêtre, et les réponses 429 sont rejouées après `retry_after`.
+    """
+
+    def __init__(self, session=None, max_retries=MAX_RETRIES):
+        self._session = session
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._routes = {}
+        self._buckets = {}
+        self._global_reset_at = 0.0
+
+    @property
+    def session(self):
+        # requests n'est importé qu'au premier appel REST (démarrage plus rapide)
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _bucket_for(self, route):
+        key = self._routes.get(route, route)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RateLimitBucket(key)
+        return bucket
+
+    def _acquire(self, route):
+        """Attend qu'une place soit disponible dans le bucket de la route"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                bucket = self._bucket_for(route)
+                delay = bucket.delay(now)
+                if self._global_reset_at > now:
+                    delay = max(delay or 0.0, self._global_reset_at - now)
+                if delay == 0.0:
+                    bucket.inflight += 1
+                    if bucket.remaining is not None:
+                        bucket.remaining -= 1
+                    return bucket
+                self._cond.wait(delay)
+
+    def _release(self, route, bucket, response):
+        """Libère la place et applique les informations de la réponse"""
+        with self._cond:
+            now = time.monotonic()
+            bucket.inflight -= 1
+            if response is not None:
+                headers = response.headers
+                bucket_hash = headers.get('X-RateLimit-Bucket')
+                if bucket_hash:
+                    self._routes[route] = bucket_hash
+                    # Le bucket provisoire (clé de route) n'est plus utile
+                    provisional = self._buckets.get(route)
+                    if provisional is not None and provisional.inflight == 0:
+                        del self._buckets[route]
+                    bucket = self._bucket_for(route)
+                bucket.update(headers, now)
+
+                if response.status_code == 429:
+                    retry_after = self._retry_after(response)
+                    if headers.get('X-RateLimit-Global') or self._json(response).get('global'):
+                        self._global_reset_at = now + retry_after
+                    else:
+                        bucket.retry_until = max(bucket.retry_until, now + retry_after)
+            self._cond.notify_all()
+
+    @staticmethod
+    def _json(response):
+        try:
+            data = response.json()
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _retry_after(self, response):
+        retry_after = self._json(response).get('retry_after')
+        if retry_after is None:
+            retry_after = response.headers.get('Retry-After', 1.0)
+        return float(retry_after)
+
+    def request(self, method, url, **kwargs):
+        """Effectue la requête en respectant les limites de son bucket"""
+        route = route_key(method, url)
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            bucket = self._acquire(route)
+            sent = time.perf_counter()
+            if sent - start > 0.001:
+                REST_RATE_LIMIT_WAIT.labels(route).inc(sent - start)
+                if tracing.TRACER.enabled:
+                    tracing.TRACER.record('rest.rate_limit_wait', 'rest', start, sent, {'route': route})
+            response = None
+            try:
+                with tracing.span('rest.request', 'rest', route=route, attempt=attempt) as span:
+                    response = self.session.request(method, url, **kwargs)
+                    span.set(status=response.status_code)
+            finally:
+                self._release(route, bucket, response)
+                REST_LATENCY.labels(route).observe(time.perf_counter() - sent)
+                REST_REQUESTS.labels(route, response.status_code if response is not None else 'error').inc()
+            if response.status_code != 429:
+                break
+        return response
+
+    def bucket_state(self):
+        """État des buckets connus (limite, restant, reset, requêtes en vol)"""
+        now = time.monotonic()
+        with self._cond:
+            routes = {}
+            for route, key in self._routes.items():
+                routes.setdefault(key, []).append(route)
+            state = []
+            for key, bucket in self._buckets.items():
+                state.append({
+                    'bucket': key,
+                    'routes': routes.get(key, [key]),
+                    'limit': bucket.limit,
+                    'remaining': bucket.remaining,
+                    'reset_in': max(0.0, bucket.reset_at - now) if bucket.reset_at else 0.0,
+                    'retry_in': max(0.0, bucket.retry_until - now),
+                    'inflight': bucket.inflight,
+                })
+            return {'global_reset_in': max(0.0, self._global_reset_at - now), 'buckets': state}
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class DiscordBotClient:
+    """Client de l'API Discord authentifié par token de bot"""
+
+    def __init__(self, token=None, session=None, api_base=API_BASE, identity_ttl=IDENTITY_TTL):
+        self._token = token
+        self.session = session or RateLimitedSession()
+        self.api_base = api_base.rstrip('/')
+        self.identity_ttl = identity_ttl
+        # Cache de l'identité : {token: (expiration, données de l'application)}
+        self._identity = {}
+        self._identity_lock = threading.Lock()
+
+    @property
+    def token(self):
+        return self._token
+
+    @token.setter
+    def token(self, value):
+        # Un nouveau token invalide l'identité mise en cache
+        if value != self._token:
+            self.invalidate_identity()
+        self._token = value
+
+    def invalidate_identity(self):
+        """Oublie l'identité de l'application mise en cache"""
+        self._identity = {}
+
+    def cached_current_application(self):
+        """Application associée au token si elle est en cache et valide, sinon None"""
+        entry = self._identity.get(self._token)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def get_headers(self):
+        """Retourne les headers pour l'API Discord"""
+        if not self.token:
+            return None
+        return {
+            'Authorization': f'Bot {self.token}',
+            'Content-Type': 'application/json'
+        }
+
+    def request(self, method, route, **kwargs):
+        """Effectue un appel et retourne le JSON (DiscordAPIError si échec)"""
+        response = self.session.request(method, f'{self.api_base}{route}',
+                                        headers=self.get_headers(), **kwargs)
+        if response.status_code == 401:
+            self.invalidate_identity()
+        if response.status_code != 200:
+            try:
+                message = response.json().get('message', 'Erreur inconnue')
+            except ValueError:
+                message = 'Erreur inconnue'
+            raise DiscordAPIError(response.status_code, message)
+        return response.json()
+
+    def get_current_application(self):
+        """Application associée au token (mise en cache pendant `identity_ttl`)"""
+        data = self.cached_current_application()
+        if data is not None:
+            return data
+
+        # Workers qui manquent le cache en même temps : un seul appel REST,
+        # les autres attendent sa réponse
+        with self._identity_lock:
+            data = self.cached_current_application()
+            if data is not None:
+                return data
+            token = self._token
+            data = self.request('GET', '/oauth2/applications/@me')
+            self._identity = {token: (time.monotonic() + self.identity_ttl, data)}
+        return data
+
+    def get_application(self, app_id):
+        """Informations d'une application"""
+        return self.request('GET', f'/applications/{app_id}')
+
+    def edit_application(self, app_id, **fields):
+        """Modifie une application (nom, icône...)"""
+        data = self.request('PATCH', f'/applications/{app_id}', json=fields)
+
+        # Garder le cache d'identité à jour avec la réponse
+        entry = self._identity.get(self._token)
+        if entry and entry[1].get('id') == data.get('id'):
+            self._identity = {self._token: (entry[0], data)}
+        return data
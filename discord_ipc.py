@@ -0,0 +1,274 @@
+"""
+Client IPC Discord asynchrone
+Protocole local de Discord (socket Unix / named pipe Windows) sur asyncio
+"""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+import threading
+import uuid
+
+# Opcodes du protocole IPC
+OP_HANDSHAKE = 0
+OP_FRAME = 1
+OP_CLOSE = 2
+OP_PING = 3
+OP_PONG = 4
+
+# En-tête d'une trame : opcode + longueur (little endian)
+HEADER = struct.Struct('<II')
+
+CONNECT_TIMEOUT = 5.0
+REQUEST_TIMEOUT = 10.0
+
+# Sous-dossiers utilisés par les installations Flatpak / Snap
+UNIX_SUBDIRS = ('', 'app/com.discordapp.Discord', 'snap.discord',
+                '.flatpak/com.discordapp.Discord/xdg-run')
+
+
+class DiscordIPCError(Exception):
+    """Erreur de communication avec le client Discord"""
+
+
+def get_ipc_paths(pipe=None):
+    """Liste les chemins IPC candidats (discord-ipc-0 à 9)"""
+    indexes = range(10) if pipe is None else [pipe]
+
+    if sys.platform == 'win32':
+        return [rf'\\?\pipe\discord-ipc-{i}' for i in indexes]
+
+    tempdir = (os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR')
+               or os.environ.get('TMP') or os.environ.get('TEMP') or '/tmp')
+    return [os.path.join(tempdir, subdir, f'discord-ipc-{i}')
+            for i in indexes for subdir in UNIX_SUBDIRS]
+
+
+def build_activity(payload):
+    """Convertit un payload de présence en activité Discord"""
+    activity = {}
+    for key in ('details', 'state'):
+        if payload.get(key):
+            activity[key] = payload[key]
+
+    timestamps = {key: payload[key] for key in ('start', 'end') if payload.get(key)}
+    if timestamps:
+        activity['timestamps'] = timestamps
+
+    assets = {key: payload[key] for key in ('large_image', 'large_text', 'small_image', 'small_text')
+              if payload.get(key)}
+    if assets:
+        activity['assets'] = assets
+
+    return activity or None
+
+
+class AsyncDiscordIPC:
+    """Connexion IPC à Discord
+
+    Les commandes sont écrites dès leur appel (pipelining) et chaque
+    réponse est associée à sa requête grâce au nonce.
+    """
+
+    def __init__(self, client_id, pipe=None):
+        self.client_id = str(client_id)
+        self.pipe = pipe
+        self.connected = False
+        self.path = None
+        self._reader = None
+        self._writer = None
+        self._write_lock = None
+        self._read_task = None
+        self._closed = None
+        self._pending = {}
+
+    async def connect(self, timeout=CONNECT_TIMEOUT):
+        """Ouvre la connexion et effectue le handshake"""
+        await asyncio.wait_for(self._connect(), timeout)
+
+    async def _connect(self):
+        last_error = None
+        for path in get_ipc_paths(self.pipe):
+            try:
+                self._reader, self._writer = await self._open(path)
+                self.path = path
+                break
+            except (OSError, ValueError) as e:
+                last_error = e
+        else:
+            raise DiscordIPCError(f"Discord n'est pas lancé ou introuvable ({last_error})")
+
+        self._write_lock = asyncio.Lock()
+        self._closed = asyncio.Event()
+        try:
+            self._write_frame(OP_HANDSHAKE, {'v': 1, 'client_id': self.client_id})
+            await self._writer.drain()
+
+            op, data = await self._read_frame()
+            if op == OP_CLOSE or data.get('evt') == 'ERROR':
+                message = data.get('message') or data.get('data', {}).get('message', 'Handshake refusé')
+                raise DiscordIPCError(message)
+        except BaseException:
+            # Handshake refusé, réponse invalide ou délai dépassé : ne pas laisser le socket ouvert
+            self._writer.close()
+            self._writer = None
+            raise
+
+        self.connected = True
+        self._read_task = asyncio.ensure_future(self._read_loop())
+
+    async def _open(self, path):
+        """Ouvre le socket (Unix) ou le named pipe (Windows)"""
+        if sys.platform == 'win32':
+            loop = asyncio.get_event_loop()
+            reader = asyncio.StreamReader()
+            protocol = asyncio.StreamReaderProtocol(reader)
+            transport, _ = await loop.create_pipe_connection(lambda: protocol, path)
+            return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+        return await asyncio.open_unix_connection(path)
+
+    def _write_frame(self, op, payload):
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self._writer.write(HEADER.pack(op, len(data)) + data)
+
+    async def _read_frame(self):
+        op, length = HEADER.unpack(await self._reader.readexactly(HEADER.size))
+        data = await self._reader.readexactly(length)
+        return op, json.loads(data.decode('utf-8'))
+
+    async def _read_loop(self):
+        """Distribue les réponses de Discord aux requêtes en attente"""
+        try:
+            while True:
+                op, data = await self._read_frame()
+                if op == OP_PING:
+                    self._write_frame(OP_PONG, data)
+                    continue
+                if op == OP_CLOSE:
+                    raise DiscordIPCError(data.get('message', 'Connexion fermée par Discord'))
+
+                future = self._pending.pop(data.get('nonce'), None)
+                if future is None or future.done():
+                    continue
+                if data.get('evt') == 'ERROR':
+                    future.set_exception(DiscordIPCError(data.get('data', {}).get('message', 'Erreur IPC')))
+                else:
+                    future.set_result(data)
+        except asyncio.CancelledError:
+            self._fail_pending(DiscordIPCError("Connexion fermée"))
+            raise
+        except (asyncio.IncompleteReadError, OSError, ValueError) as e:
+            self._fail_pending(DiscordIPCError(f"Connexion IPC perdue: {e}"))
+        except DiscordIPCError as e:
+            self._fail_pending(e)
+        finally:
+            # Connexion perdue (OP_CLOSE, pipe cassé, trame invalide) : libérer le socket
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._closed.set()
+
+    async def wait_closed(self):
+        """Attend la fin de la connexion (fermeture, Discord quitté, pipe cassé)"""
+        if self._closed:
+            await self._closed.wait()
+
+    def _fail_pending(self, error):
+        self.connected = False
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def command(self, cmd, args=None, timeout=REQUEST_TIMEOUT):
+        """Envoie une commande et attend l'accusé de réception de Discord"""
+        if not self.connected:
+            raise DiscordIPCError("Non connecté à Discord")
+
+        nonce = str(uuid.uuid4())
+        future = asyncio.get_event_loop().create_future()
+        self._pending[nonce] = future
+        try:
+            # Seule l'écriture est sérialisée : plusieurs commandes
+            # peuvent attendre leur réponse en même temps
+            async with self._write_lock:
+                if self._writer is None:
+                    # Connexion perdue pendant l'attente du verrou
+                    raise DiscordIPCError("Connexion fermée")
+                self._write_frame(OP_FRAME, {'cmd': cmd, 'args': args or {}, 'nonce': nonce})
+                await self._writer.drain()
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(nonce, None)
+
+    async def set_activity(self, payload):
+        """Met à jour l'activité affichée"""
+        return await self.command('SET_ACTIVITY', {'pid': os.getpid(),
+                                                   'activity': build_activity(payload)})
+
+    async def clear_activity(self):
+        """Efface l'activité affichée"""
+        return await self.command('SET_ACTIVITY', {'pid': os.getpid(), 'activity': None})
+
+    async def close(self):
+        """Ferme proprement la connexion"""
+        self.connected = False
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer:
+            try:
+                self._write_frame(OP_CLOSE, {})
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+        self._fail_pending(DiscordIPCError("Connexion fermée"))
+        if self._closed:
+            self._closed.set()
+
+
+class EventLoopThread:
+    """Boucle asyncio dédiée, exécutée dans un thread de fond"""
+
+    def __init__(self, name='discord-rpc-loop'):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Démarre la boucle (une seule fois)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        if sys.platform == 'win32':
+            self.loop = asyncio.ProactorEventLoop()
+        else:
+            self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def submit(self, coro):
+        """Planifie une coroutine, retourne un concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Exécute une fonction dans le thread de la boucle"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self):
+        """Arrête la boucle"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
@@ -3,17 +3,38 @@ Discord Bot & Rich Presence Manager Advanced
 Application complète pour gérer bot Discord et Rich Presence avec assets
 """
 
+import time
+
+# Début du démarrage, avant les imports (mode --debug)
+STARTUP_TIME = time.perf_counter()
+
+import argparse
+import importlib.util
+import logging
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
-import os
-import time
-import threading
-import base64
-import requests
-from pypresence import Presence
-from PIL import Image, ImageTk
-import io
+
+# Pillow, requests et le pool d'import ne sont chargés qu'à leur première utilisation
+import app_config
+import metrics
+import tracing
+from asset_list_view import VirtualAssetList
+from asset_store import AssetStore
+from discord_api import (REST_LATENCY, REST_RATE_LIMIT_WAIT, REST_REQUESTS,
+                         DiscordAPIError, DiscordBotClient)
+from presence_engine import (IPC_RECONNECTS, MIN_ROTATION_INTERVAL, PRESENCE_LATENCY,
+                             PRESENCE_RATE_LIMITED, PRESENCE_UPDATES, STATE_CONNECTED,
+                             STATE_RECONNECTING, PresenceHub, PresenceSnapshot, parse_connections)
+from thumbnails import ThumbnailCache
+from ui_tasks import UITaskRunner
+from ui_watchdog import STALL_THRESHOLD, UI_LAG, UI_STALLS, StallDetector
+
+# Rafraîchissement de l'onglet Statistiques (ms)
+STATS_REFRESH_MS = 2000
+
+# Attente maximum de la fermeture des connexions RPC à la fermeture de la fenêtre (s)
+RPC_CLOSE_TIMEOUT = 1.0
 
 class DiscordAdvancedManager:
     def __init__(self, root):
@@ -25,13 +46,34 @@ class DiscordAdvancedManager:
         self.load_config()
         
         # RPC
-        self.rpc = None
-        self.rpc_connected = False
-        self.update_thread = None
+        self.presence_hub = PresenceHub()
+        # Les changements d'état arrivent depuis la boucle asyncio
+        self.presence_hub.add_listener(lambda engine, state: self.root.after(0, self.refresh_rpc_status))
+        self.presence_hub.start()
+        self.bind_presence_traces()
+        self.publish_presence()
+        self.rotation_enabled_var.trace_add('write', lambda *args: self.apply_rotation())
+        self.apply_rotation()
         
         # Bot
-        self.bot_session = requests.Session()
+        self.bot_client = DiscordBotClient()
         self.application_id = None
+        self.task_runner = UITaskRunner(self.root)
+        
+        # Assets : index ouvert à la première ouverture de l'onglet
+        self.asset_store = None
+        
+        # Métriques (--metrics-port)
+        self.metrics_server = None
+        self.stall_detector = None
+        
+        # Config : écriture différée à chaque modification, rechargement à chaud
+        self._save_after = None
+        self._applying_config = False
+        self.bind_config_traces()
+        self.config_watcher = app_config.ConfigWatcher(
+            lambda config: self.root.after(0, self.on_config_changed, config))
+        self.config_watcher.start()
         
     def setup_window(self):
         """Configuration de la fenêtre principale"""
@@ -57,6 +99,7 @@ class DiscordAdvancedManager:
         """Initialisation des variables"""
         # RPC Variables
         self.client_id_var = tk.StringVar()
+        self.rpc_pipes_var = tk.StringVar()
         self.details_var = tk.StringVar()
         self.state_var = tk.StringVar()
         self.large_image_var = tk.StringVar()
@@ -66,13 +109,31 @@ class DiscordAdvancedManager:
         self.show_time_var = tk.BooleanVar()
         self.rpc_status_var = tk.StringVar(value="❌ RPC Déconnecté")
         
+        # Profils de présence {nom: champs}
+        self.presence_profiles = {}
+        self.profile_name_var = tk.StringVar()
+        self.rotation_interval_var = tk.StringVar(value="30")
+        self.rotation_enabled_var = tk.BooleanVar()
+        self.rotation_status_var = tk.StringVar()
+        
         # Bot Variables
         self.bot_token_var = tk.StringVar()
         self.bot_name_var = tk.StringVar()
         self.bot_status_var = tk.StringVar(value="❌ Bot Déconnecté")
+        self.bot_progress_var = tk.StringVar()
+        self.bot_tasks = []
         
         # Assets Variables
-        self.assets_list = []
+        self.asset_search_var = tk.StringVar()
+        self.assets_app_var = tk.StringVar()
+        
+        # Statistiques Variables
+        self.stats_presence_var = tk.StringVar()
+        self.stats_api_var = tk.StringVar()
+        self.stats_ui_var = tk.StringVar()
+        self.stats_endpoint_var = tk.StringVar(value="Endpoint Prometheus désactivé (option --metrics-port)")
+        self.stats_frame = None
+        self._stats_after = None
         
     def setup_styles(self):
         """Configuration des styles"""
@@ -129,21 +190,39 @@ class DiscordAdvancedManager:
         self.notebook = ttk.Notebook(main_frame, style='Custom.TNotebook')
         self.notebook.pack(fill="both", expand=True, padx=0, pady=0)
         
-        # Onglet Rich Presence
-        self.create_rpc_tab()
-        
-        # Onglet Bot Manager
-        self.create_bot_tab()
-        
-        # Onglet Assets Manager
-        self.create_assets_tab()
-        
-    def create_rpc_tab(self):
+        # Onglets construits à leur première sélection
+        self.tab_builders = {}
+        self.add_tab("🎮 Rich Presence", self.create_rpc_tab)
+        self.add_tab("🤖 Bot Manager", self.create_bot_tab)
+        self.add_tab("🖼️ Assets Manager", self.create_assets_tab)
+        self.add_tab("📊 Statistiques", self.create_stats_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        
+        # L'onglet Rich Presence est affiché (et lu par la config) dès le démarrage
+        self.build_tab(self.notebook.tabs()[0])
+        
+    def add_tab(self, text, builder):
+        """Ajoute un onglet vide dont le contenu sera créé par `builder(frame)`"""
+        frame = tk.Frame(self.notebook, bg=self.colors['bg'])
+        self.notebook.add(frame, text=text)
+        self.tab_builders[str(frame)] = (frame, builder)
+        
+    def on_tab_changed(self, event=None):
+        """Construit l'onglet affiché et relance le rafraîchissement des statistiques"""
+        tab_id = self.notebook.select()
+        self.build_tab(tab_id)
+        if self.stats_frame is not None and tab_id == str(self.stats_frame) and self._stats_after is None:
+            self.refresh_stats()
+        
+    def build_tab(self, tab_id):
+        """Construit le contenu d'un onglet s'il ne l'a pas encore été"""
+        entry = self.tab_builders.pop(str(tab_id), None)
+        if entry:
+            frame, builder = entry
+            builder(frame)
+        
+    def create_rpc_tab(self, rpc_frame):
         """Création de l'onglet Rich Presence"""
-        # Frame avec scroll pour RPC
-        rpc_frame = tk.Frame(self.notebook, bg=self.colors['bg'])
-        self.notebook.add(rpc_frame, text="🎮 Rich Presence")
-        
         # Canvas pour scroll
         canvas = tk.Canvas(rpc_frame, bg=self.colors['bg'], highlightthickness=0)
         scrollbar = ttk.Scrollbar(rpc_frame, orient="vertical", command=canvas.yview)
@@ -199,13 +278,11 @@ class DiscordAdvancedManager:
         self.create_rpc_text_section(parent)
         self.create_rpc_image_section(parent)
         self.create_rpc_options_section(parent)
+        self.create_rpc_profiles_section(parent)
         self.create_rpc_buttons(parent)
         
-    def create_bot_tab(self):
+    def create_bot_tab(self, bot_frame):
         """Création de l'onglet Bot Manager"""
-        bot_frame = tk.Frame(self.notebook, bg=self.colors['bg'])
-        self.notebook.add(bot_frame, text="🤖 Bot Manager")
-        
         # Canvas pour scroll
         canvas = tk.Canvas(bot_frame, bg=self.colors['bg'], highlightthickness=0)
         scrollbar = ttk.Scrollbar(bot_frame, orient="vertical", command=canvas.yview)
@@ -258,10 +335,10 @@ class DiscordAdvancedManager:
         self.create_bot_profile_section(parent)
         self.create_bot_buttons(parent)
         
-    def create_assets_tab(self):
+    def create_assets_tab(self, assets_frame):
         """Création de l'onglet Assets Manager"""
-        assets_frame = tk.Frame(self.notebook, bg=self.colors['bg'])
-        self.notebook.add(assets_frame, text="🖼️ Assets Manager")
+        self.asset_store = AssetStore()
+        self.thumbnail_cache = ThumbnailCache(self.task_runner)
         
         # Canvas pour scroll
         canvas = tk.Canvas(assets_frame, bg=self.colors['bg'], highlightthickness=0)
@@ -286,6 +363,7 @@ class DiscordAdvancedManager:
         # Contenu Assets
         self.create_assets_content(scrollable_frame)
         self.bind_mouse_wheel_to_canvas(canvas)
+        self.load_local_assets()
         
     def create_assets_content(self, parent):
         """Contenu de l'onglet Assets"""
@@ -330,6 +408,37 @@ class DiscordAdvancedManager:
         canvas.bind('<Enter>', _bind_mousewheel)
         canvas.bind('<Leave>', _unbind_mousewheel)
         
+    def create_stats_tab(self, stats_frame):
+        """Création de l'onglet Statistiques"""
+        self.stats_frame = stats_frame
+        
+        title_frame = tk.Frame(stats_frame, bg=self.colors['bg'], height=60)
+        title_frame.pack(fill='x', padx=20, pady=(10, 5))
+        title_frame.pack_propagate(False)
+        tk.Label(title_frame, text="📊 Statistiques", 
+                bg=self.colors['bg'], fg=self.colors['text'],
+                font=('Segoe UI', 16, 'bold')).pack(expand=True)
+        
+        for title, variable in (("🎮 Rich Presence", self.stats_presence_var),
+                                ("🤖 API Discord", self.stats_api_var),
+                                ("🖥️ Interface", self.stats_ui_var)):
+            card = self.create_card_frame(stats_frame, title)
+            tk.Label(card, textvariable=variable, justify='left', anchor='w',
+                    bg=self.colors['card'], fg=self.colors['text'],
+                    font=('Consolas', 9)).pack(fill='x', pady=(10, 0))
+        
+        tk.Label(stats_frame, textvariable=self.stats_endpoint_var,
+                bg=self.colors['bg'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(pady=10)
+        
+        # Trace d'exécution (option --trace)
+        tk.Button(stats_frame, text="💾 Exporter la trace", command=self.export_trace,
+                 state='normal' if tracing.TRACER.enabled else 'disabled',
+                 bg=self.colors['accent'], fg=self.colors['text'],
+                 font=('Segoe UI', 9), relief='flat', pady=5).pack(pady=(0, 10))
+        
+        self.refresh_stats()
+        
     # =================== RPC SECTIONS ===================
     
     def create_rpc_config_section(self, parent):
@@ -352,6 +461,11 @@ class DiscordAdvancedManager:
                            command=self.show_rpc_help)
         help_btn.pack(side='right', padx=(5, 0))
         
+        tk.Label(config_frame, text="Instances Discord (n° de pipe, ex: 0,1 - vide : automatique)", 
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(anchor='w', pady=(5, 2))
+        self.create_entry(config_frame, self.rpc_pipes_var).pack(fill='x', pady=(0, 5))
+        
     def create_rpc_text_section(self, parent):
         """Section textes RPC"""
         text_frame = self.create_card_frame(parent, "📝 Textes du statut")
@@ -366,6 +480,10 @@ class DiscordAdvancedManager:
                 font=('Segoe UI', 9)).pack(anchor='w', pady=(10, 2))
         self.create_entry(text_frame, self.state_var).pack(fill='x')
         
+        tk.Label(text_frame, text="Variables : {time} {date} {uptime} {counter} (ex: {time:%H:%M:%S})", 
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 8)).pack(anchor='w', pady=(5, 0))
+        
     def create_rpc_image_section(self, parent):
         """Section images RPC"""
         image_frame = self.create_card_frame(parent, "🖼️ Images")
@@ -401,6 +519,52 @@ class DiscordAdvancedManager:
                                   font=('Segoe UI', 10), relief='flat')
         time_check.pack(anchor='w', pady=(10, 0))
         
+    def create_rpc_profiles_section(self, parent):
+        """Section profils de présence et rotation"""
+        profiles_frame = self.create_card_frame(parent, "🔁 Profils & Rotation")
+        
+        tk.Label(profiles_frame, text="Nom du profil", 
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(anchor='w', pady=(10, 2))
+        self.create_entry(profiles_frame, self.profile_name_var).pack(fill='x')
+        
+        btn_frame = tk.Frame(profiles_frame, bg=self.colors['card'])
+        btn_frame.pack(fill='x', pady=(10, 5))
+        
+        for text, command, color in (("💾 Enregistrer", self.save_presence_profile, 'success'),
+                                     ("📥 Charger", self.load_presence_profile, 'accent'),
+                                     ("🗑️ Supprimer", self.delete_presence_profile, 'danger')):
+            tk.Button(btn_frame, text=text, command=command,
+                     bg=self.colors[color], fg=self.colors['text'],
+                     font=('Segoe UI', 9), relief='flat', pady=5).pack(side='left', fill='x', expand=True, padx=2)
+        
+        self.profiles_listbox = tk.Listbox(profiles_frame,
+                                         bg='#40444B', fg=self.colors['text'],
+                                         font=('Segoe UI', 10),
+                                         selectbackground=self.colors['accent'],
+                                         relief='flat', bd=0, height=4, exportselection=False)
+        self.profiles_listbox.pack(fill='x', pady=5)
+        self.profiles_listbox.bind('<<ListboxSelect>>', self.on_profile_selected)
+        
+        tk.Label(profiles_frame, text="Durée d'affichage de chaque profil (secondes)", 
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(anchor='w', pady=(5, 2))
+        interval_entry = self.create_entry(profiles_frame, self.rotation_interval_var)
+        interval_entry.pack(fill='x')
+        interval_entry.bind('<Return>', lambda e: self.apply_rotation())
+        interval_entry.bind('<FocusOut>', lambda e: self.apply_rotation())
+        
+        rotation_check = tk.Checkbutton(profiles_frame, text="Rotation automatique des profils",
+                                      variable=self.rotation_enabled_var,
+                                      bg=self.colors['card'], fg=self.colors['text'],
+                                      selectcolor=self.colors['accent'],
+                                      font=('Segoe UI', 10), relief='flat')
+        rotation_check.pack(anchor='w', pady=(10, 0))
+        
+        tk.Label(profiles_frame, textvariable=self.rotation_status_var,
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(anchor='w')
+        
     def create_rpc_buttons(self, parent):
         """Boutons RPC"""
         button_frame = tk.Frame(parent, bg=self.colors['bg'])
@@ -476,6 +640,23 @@ class DiscordAdvancedManager:
                                 font=('Segoe UI', 11, 'bold'), relief='flat', pady=8)
         pp_update_btn.pack(fill='x', pady=5)
         
+        # Suivi des requêtes en cours
+        progress_frame = tk.Frame(button_frame, bg=self.colors['bg'])
+        progress_frame.pack(fill='x', pady=(10, 0))
+        
+        tk.Label(progress_frame, textvariable=self.bot_progress_var,
+                bg=self.colors['bg'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(anchor='w')
+        
+        self.bot_progress = ttk.Progressbar(progress_frame, mode='indeterminate')
+        self.bot_progress.pack(side='left', fill='x', expand=True, pady=(5, 0))
+        
+        self.bot_cancel_btn = tk.Button(progress_frame, text="✖ Annuler",
+                                      command=self.cancel_bot_tasks, state='disabled',
+                                      bg=self.colors['danger'], fg=self.colors['text'],
+                                      font=('Segoe UI', 9), relief='flat')
+        self.bot_cancel_btn.pack(side='right', padx=(5, 0), pady=(5, 0))
+        
     # =================== ASSETS SECTIONS ===================
     
     def create_add_asset_section(self, parent):
@@ -509,26 +690,49 @@ class DiscordAdvancedManager:
                           font=('Segoe UI', 11, 'bold'), relief='flat', pady=10)
         add_btn.pack(fill='x', pady=(10, 0))
         
+        # Import en masse d'un dossier
+        import_btn = tk.Button(add_frame, text="📂 Importer un dossier",
+                             command=self.import_asset_folder,
+                             bg=self.colors['accent'], fg=self.colors['text'],
+                             font=('Segoe UI', 10), relief='flat', pady=8)
+        import_btn.pack(fill='x', pady=(10, 0))
+        self.asset_import_btn = import_btn
+        
+        self.asset_import_var = tk.StringVar()
+        tk.Label(add_frame, textvariable=self.asset_import_var,
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(pady=(5, 0))
+        
     def create_assets_list_section(self, parent):
         """Section liste des assets"""
         list_frame = self.create_card_frame(parent, "📋 Assets Disponibles")
         
-        # Frame pour la liste avec scrollbar
-        list_container = tk.Frame(list_frame, bg=self.colors['card'])
-        list_container.pack(fill='both', expand=True, pady=10)
-        
-        # Listbox avec scrollbar
-        scrollbar_assets = ttk.Scrollbar(list_container)
-        scrollbar_assets.pack(side='right', fill='y')
+        # Recherche incrémentale par préfixe du nom
+        tk.Label(list_frame, text="🔍 Rechercher", 
+                bg=self.colors['card'], fg=self.colors['text_muted'],
+                font=('Segoe UI', 9)).pack(anchor='w', pady=(10, 2))
+        self.create_entry(list_frame, self.asset_search_var).pack(fill='x')
+        self.asset_search_var.trace_add('write', lambda *args: self.assets_list.set_filter(self.asset_search_var.get()))
         
-        self.assets_listbox = tk.Listbox(list_container,
-                                       yscrollcommand=scrollbar_assets.set,
-                                       bg='#40444B', fg=self.colors['text'],
-                                       font=('Segoe UI', 10),
-                                       selectbackground=self.colors['accent'],
-                                       relief='flat', bd=0, height=8)
-        self.assets_listbox.pack(side='left', fill='both', expand=True)
-        scrollbar_assets.config(command=self.assets_listbox.yview)
+        # Application Discord associée
+        tk.Label(list_frame, textvariable=self.assets_app_var,
+                bg=self.colors['card'], fg=self.colors['text'],
+                font=('Segoe UI', 10)).pack(anchor='w', pady=(5, 0))
+        
+        # Liste virtualisée : seules les lignes visibles sont dessinées
+        self.assets_list = VirtualAssetList(list_frame, self.colors,
+                                            thumbnail_cache=ThumbnailCache(self.task_runner, size=28),
+                                            on_select=self.on_asset_selected,
+                                            empty_text="Aucun asset trouvé - Ajoutez-en un!")
+        self.assets_list.pack(fill='both', expand=True, pady=10)
+        self.bind_mouse_wheel_to_canvas(self.assets_list)
+        
+        # Aperçu de l'asset sélectionné
+        self.asset_thumb_label = tk.Label(list_frame, text="",
+                                        bg=self.colors['card'], fg=self.colors['text_muted'],
+                                        font=('Segoe UI', 9), compound='left', padx=5)
+        self.asset_thumb_label.pack(anchor='w')
+        self.asset_thumb_hash = None
         
         # Boutons pour assets
         btn_frame = tk.Frame(list_frame, bg=self.colors['card'])
@@ -578,98 +782,205 @@ class DiscordAdvancedManager:
     
     def toggle_rpc_connection(self):
         """Bascule la connexion RPC"""
-        if not self.rpc_connected:
+        if not self.presence_hub.active:
             self.connect_rpc()
         else:
             self.disconnect_rpc()
             
     def connect_rpc(self):
-        """Connexion RPC"""
-        client_id = self.client_id_var.get().strip()
-        if not client_id:
+        """Connexion RPC (handshakes exécutés en parallèle dans la boucle asyncio)"""
+        try:
+            connections = parse_connections(self.client_id_var.get(), self.rpc_pipes_var.get())
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        if not connections:
             messagebox.showerror("Erreur", "Veuillez entrer votre Client ID!")
             return
             
+        self.rpc_status_var.set("⏳ Connexion RPC...")
+        self.rpc_status_label.configure(fg=self.colors['warning'])
+        self.rpc_connect_btn.configure(state='disabled')
+        
+        future = self.presence_hub.connect(connections)
+        future.add_done_callback(lambda f: self.root.after(0, self.on_rpc_connect_done, f))
+        
+    def on_rpc_connect_done(self, future):
+        """Résultat de la connexion RPC (thread de l'interface)"""
+        self.rpc_connect_btn.configure(state='normal')
+        
         try:
-            self.rpc = Presence(client_id)
-            self.rpc.connect()
-            self.rpc_connected = True
-            
-            self.rpc_status_var.set("✅ RPC Connecté")
-            self.rpc_status_label.configure(fg=self.colors['success'])
-            self.rpc_connect_btn.configure(text="🔌 Déconnecter RPC", bg=self.colors['danger'])
+            results = future.result()
+        except Exception as e:
+            results = [(None, e)]
+        errors = [(key, error) for key, error in results if error is not None]
+        self.refresh_rpc_status()
+        
+        if not self.presence_hub.connected:
+            messagebox.showerror("Erreur RPC", "Impossible de se connecter:\n" + self.format_rpc_errors(errors))
+            return
             
-            self.start_rpc_auto_update()
+        if errors:
+            messagebox.showwarning("RPC partiellement connecté",
+                                   "Certaines connexions ont échoué:\n" + self.format_rpc_errors(errors))
+        else:
             messagebox.showinfo("Succès", "RPC connecté avec succès!")
             
-        except Exception as e:
-            messagebox.showerror("Erreur RPC", f"Impossible de se connecter:\n{str(e)}")
+    @staticmethod
+    def format_rpc_errors(errors):
+        """Liste lisible des erreurs de connexion par (client ID, instance)"""
+        lines = []
+        for key, error in errors:
+            if key is None:
+                lines.append(str(error))
+            else:
+                client_id, pipe = key
+                instance = "auto" if pipe is None else f"discord-ipc-{pipe}"
+                lines.append(f"• {client_id} ({instance}): {error}")
+        return "\n".join(lines)
             
     def disconnect_rpc(self):
         """Déconnexion RPC"""
-        if self.rpc:
-            try:
-                self.rpc.close()
-            except:
-                pass
-                
-        self.rpc_connected = False
-        self.rpc = None
+        self.presence_hub.disconnect()
+        self.refresh_rpc_status()
+        
+    def refresh_rpc_status(self):
+        """Affiche l'état des connexions RPC (connecté, reconnexion en cours...)"""
+        engines = [engine for engine in self.presence_hub.engines.values() if engine.target is not None]
+        if not engines:
+            self.rpc_status_var.set("❌ RPC Déconnecté")
+            self.rpc_status_label.configure(fg=self.colors['danger'])
+            if str(self.rpc_connect_btn['state']) == 'normal':
+                self.rpc_connect_btn.configure(text="🔌 Connecter RPC", bg=self.colors['success'])
+            return
+            
+        connected = sum(1 for engine in engines if engine.state == STATE_CONNECTED)
+        reconnecting = [engine for engine in engines if engine.state == STATE_RECONNECTING]
+        count = f" ({connected}/{len(engines)})" if len(engines) > 1 else ""
+        
+        if reconnecting:
+            # Discord redémarré ou fermé : la présence sera renvoyée à la reconnexion
+            attempt = max(engine.reconnect_attempt for engine in reconnecting)
+            self.rpc_status_var.set(f"🔄 Reconnexion RPC... (tentative {attempt}){count}")
+            self.rpc_status_label.configure(fg=self.colors['warning'])
+        elif connected == len(engines):
+            self.rpc_status_var.set(f"✅ RPC Connecté{count}")
+            self.rpc_status_label.configure(fg=self.colors['success'])
+        else:
+            self.rpc_status_var.set(f"⏳ Connexion RPC...{count}")
+            self.rpc_status_label.configure(fg=self.colors['warning'])
+        self.rpc_connect_btn.configure(text="🔌 Déconnecter RPC", bg=self.colors['danger'])
+        
+    def bind_presence_traces(self):
+        """Surveille les champs de la présence pour pousser les modifications"""
+        for var in (self.details_var, self.state_var,
+                    self.large_image_var, self.large_text_var,
+                    self.small_image_var, self.small_text_var,
+                    self.show_time_var):
+            var.trace_add('write', self.on_presence_field_changed)
+            
+    def on_presence_field_changed(self, *args):
+        """Appelé à chaque modification d'un champ de la présence"""
+        self.publish_presence()
+        
+    def presence_fields(self):
+        """Champs actuels de la présence"""
+        return {
+            'details': self.details_var.get(),
+            'state': self.state_var.get(),
+            'large_image': self.large_image_var.get(),
+            'large_text': self.large_text_var.get(),
+            'small_image': self.small_image_var.get(),
+            'small_text': self.small_text_var.get(),
+            'show_time': self.show_time_var.get(),
+        }
         
-        self.rpc_status_var.set("❌ RPC Déconnecté")
-        self.rpc_status_label.configure(fg=self.colors['danger'])
-        self.rpc_connect_btn.configure(text="🔌 Connecter RPC", bg=self.colors['success'])
+    @tracing.traced('ui.publish_presence', 'ui')
+    def publish_presence(self):
+        """Publie une photo des champs vers le moteur (thread de l'interface)"""
+        self.presence_hub.publish(PresenceSnapshot.from_dict(self.presence_fields()))
         
-    def start_rpc_auto_update(self):
-        """Démarre la mise à jour automatique RPC"""
-        if self.update_thread and self.update_thread.is_alive():
+    def refresh_profiles_list(self):
+        """Met à jour la liste des profils"""
+        self.profiles_listbox.delete(0, tk.END)
+        for name in self.presence_profiles:
+            self.profiles_listbox.insert(tk.END, name)
+            
+    def selected_profile_name(self):
+        selection = self.profiles_listbox.curselection()
+        return self.profiles_listbox.get(selection[0]) if selection else None
+        
+    def on_profile_selected(self, event=None):
+        name = self.selected_profile_name()
+        if name:
+            self.profile_name_var.set(name)
+            
+    def save_presence_profile(self):
+        """Enregistre les champs actuels sous un nom de profil"""
+        name = self.profile_name_var.get().strip()
+        if not name:
+            messagebox.showerror("Erreur", "Veuillez entrer un nom de profil!")
             return
             
-        self.update_thread = threading.Thread(target=self.rpc_auto_update_loop, daemon=True)
-        self.update_thread.start()
-        
-    def rpc_auto_update_loop(self):
-        """Boucle de mise à jour automatique RPC"""
-        while self.rpc_connected and self.rpc:
-            try:
-                self.update_rpc_presence()
-                time.sleep(15)
-            except:
-                break
-                
-    def update_rpc_presence(self):
-        """Met à jour la Rich Presence"""
-        if not self.rpc_connected or not self.rpc:
+        self.presence_profiles[name] = self.presence_fields()
+        self.refresh_profiles_list()
+        self.apply_rotation()
+        self.schedule_save_config()
+        
+    def load_presence_profile(self):
+        """Recopie un profil dans les champs de la présence"""
+        name = self.selected_profile_name()
+        if not name:
+            messagebox.showwarning("Attention", "Veuillez sélectionner un profil!")
+            return
+            
+        fields = self.presence_profiles[name]
+        self.details_var.set(fields.get('details', ''))
+        self.state_var.set(fields.get('state', ''))
+        self.large_image_var.set(fields.get('large_image', ''))
+        self.large_text_var.set(fields.get('large_text', ''))
+        self.small_image_var.set(fields.get('small_image', ''))
+        self.small_text_var.set(fields.get('small_text', ''))
+        self.show_time_var.set(fields.get('show_time', False))
+        
+    def delete_presence_profile(self):
+        """Supprime le profil sélectionné"""
+        name = self.selected_profile_name()
+        if not name:
+            messagebox.showwarning("Attention", "Veuillez sélectionner un profil!")
+            return
+            
+        del self.presence_profiles[name]
+        self.refresh_profiles_list()
+        self.apply_rotation()
+        self.schedule_save_config()
+        
+    def apply_rotation(self):
+        """Démarre, met à jour ou arrête la rotation des profils"""
+        if not self.rotation_enabled_var.get():
+            self.presence_hub.stop_rotation()
+            self.rotation_status_var.set("")
+            # Revenir à la présence saisie dans les champs
+            self.publish_presence()
             return
             
         try:
-            presence_data = {}
+            interval = app_config.parse_rotation_interval(self.rotation_interval_var.get())
+        except ValueError:
+            self.rotation_status_var.set("⚠️ Durée invalide")
+            return
             
-            if self.details_var.get().strip():
-                presence_data['details'] = self.details_var.get().strip()
-                
-            if self.state_var.get().strip():
-                presence_data['state'] = self.state_var.get().strip()
-                
-            if self.large_image_var.get().strip():
-                presence_data['large_image'] = self.large_image_var.get().strip()
-                
-            if self.large_text_var.get().strip():
-                presence_data['large_text'] = self.large_text_var.get().strip()
-                
-            if self.small_image_var.get().strip():
-                presence_data['small_image'] = self.small_image_var.get().strip()
-                
-            if self.small_text_var.get().strip():
-                presence_data['small_text'] = self.small_text_var.get().strip()
-                
-            if self.show_time_var.get():
-                presence_data['start'] = int(time.time())
-                
-            self.rpc.update(**presence_data)
+        if len(self.presence_profiles) < 2:
+            self.presence_hub.stop_rotation()
+            self.rotation_status_var.set("⚠️ Enregistrez au moins 2 profils")
+            return
             
-        except Exception as e:
-            print(f"Erreur mise à jour RPC: {e}")
+        # Quota Discord : pas plus de 5 mises à jour par 20 secondes
+        interval = max(interval, MIN_ROTATION_INTERVAL)
+        self.presence_hub.start_rotation([(PresenceSnapshot.from_dict(fields), interval)
+                        for fields in self.presence_profiles.values()])
+        self.rotation_status_var.set(f"🔁 {len(self.presence_profiles)} profils, "
+                                     f"changement toutes les {interval:g}s")
     
     def show_rpc_help(self):
         """Affiche l'aide RPC"""
@@ -701,39 +1012,83 @@ Pour les images, utilisez l'onglet Assets Manager !"""
         
         messagebox.showinfo("Aide - Token Bot Discord", help_text)
         
-    def get_bot_headers(self):
-        """Retourne les headers pour l'API Discord"""
+    def run_bot_task(self, description, func, *args, on_success=None, on_error=None):
+        """Exécute un appel REST hors du thread de l'interface"""
+        task = self.task_runner.submit(description, func, *args,
+                                       on_success=on_success, on_error=on_error,
+                                       on_finish=self.on_bot_task_finished)
+        self.bot_tasks.append(task)
+        self.refresh_bot_progress()
+        return task
+        
+    def on_bot_task_finished(self, task):
+        """Fin d'une requête (thread de l'interface)"""
+        if task in self.bot_tasks:
+            self.bot_tasks.remove(task)
+        self.refresh_bot_progress()
+        
+    def cancel_bot_tasks(self):
+        """Annule les requêtes en cours (leurs résultats seront ignorés)"""
+        for task in self.bot_tasks:
+            task.cancel()
+        self.bot_tasks = []
+        self.refresh_bot_progress()
+        self.bot_progress_var.set("Opération annulée")
+        
+    def refresh_bot_progress(self):
+        """Met à jour l'indicateur de progression de l'onglet Bot"""
+        if not hasattr(self, 'bot_progress'):
+            # Onglet Bot pas encore construit (requête lancée depuis les Assets)
+            return
+        if self.bot_tasks:
+            text = f"⏳ {self.bot_tasks[-1].description}..."
+            if len(self.bot_tasks) > 1:
+                text += f" (+{len(self.bot_tasks) - 1})"
+            self.bot_progress_var.set(text)
+            self.bot_progress.start(15)
+            self.bot_cancel_btn.configure(state='normal')
+        else:
+            self.bot_progress_var.set("")
+            self.bot_progress.stop()
+            self.bot_cancel_btn.configure(state='disabled')
+    
+    def get_application_id(self, then):
+        """Récupère l'ID de l'application en arrière-plan puis appelle `then(app_id)`"""
         token = self.bot_token_var.get().strip()
         if not token:
-            return None
-        return {
-            'Authorization': f'Bot {token}',
-            'Content-Type': 'application/json'
-        }
-    
-    def get_application_id(self):
-        """Récupère l'ID de l'application"""
-        headers = self.get_bot_headers()
-        if not headers:
-            return None
+            messagebox.showerror("Erreur", "Token invalide ou connexion échouée!")
+            return
+        self.bot_client.token = token
+        
+        def on_success(data):
+            self.application_id = data['id']
+            self.bot_status_var.set("✅ Bot Connecté")
+            self.bot_status_label.configure(fg=self.colors['success'])
+            then(data['id'])
             
-        try:
-            response = self.bot_session.get('https://discord.com/api/v10/oauth2/applications/@me', 
-                                          headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                self.application_id = data['id']
-                self.bot_status_var.set("✅ Bot Connecté")
-                self.bot_status_label.configure(fg=self.colors['success'])
-                return data['id']
-            else:
+        def on_error(error):
+            if isinstance(error, DiscordAPIError):
                 self.bot_status_var.set("❌ Token Invalide")
-                self.bot_status_label.configure(fg=self.colors['danger'])
-                return None
-        except Exception as e:
-            self.bot_status_var.set("❌ Erreur Connexion")
+            else:
+                self.bot_status_var.set("❌ Erreur Connexion")
             self.bot_status_label.configure(fg=self.colors['danger'])
-            return None
+            messagebox.showerror("Erreur", "Token invalide ou connexion échouée!")
+            
+        # Identité déjà connue pour ce token : aucun appel REST
+        cached = self.bot_client.cached_current_application()
+        if cached is not None:
+            on_success(cached)
+            return
+            
+        self.run_bot_task("Vérification du token", self.bot_client.get_current_application,
+                          on_success=on_success, on_error=on_error)
+    
+    def show_bot_error(self, error, context):
+        """Affiche une erreur de l'API Discord"""
+        if isinstance(error, DiscordAPIError):
+            messagebox.showerror("Erreur", f"Erreur: {error.message}")
+        else:
+            messagebox.showerror("Erreur", f"{context}:\n{str(error)}")
     
     def change_bot_name(self):
         """Change le nom du bot"""
@@ -742,24 +1097,13 @@ Pour les images, utilisez l'onglet Assets Manager !"""
             messagebox.showerror("Erreur", "Veuillez entrer un nom!")
             return
             
-        app_id = self.get_application_id()
-        if not app_id:
-            messagebox.showerror("Erreur", "Token invalide ou connexion échouée!")
-            return
+        def rename(app_id):
+            self.run_bot_task("Changement du nom",
+                              lambda: self.bot_client.edit_application(app_id, name=new_name),
+                              on_success=lambda _: messagebox.showinfo("Succès", f"Nom changé en '{new_name}' avec succès!"),
+                              on_error=lambda e: self.show_bot_error(e, "Erreur lors du changement de nom"))
             
-        headers = self.get_bot_headers()
-        data = {'name': new_name}
-        
-        try:
-            response = self.bot_session.patch(f'https://discord.com/api/v10/applications/{app_id}',
-                                            headers=headers, json=data)
-            if response.status_code == 200:
-                messagebox.showinfo("Succès", f"Nom changé en '{new_name}' avec succès!")
-            else:
-                error_data = response.json()
-                messagebox.showerror("Erreur", f"Erreur: {error_data.get('message', 'Erreur inconnue')}")
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du changement de nom:\n{str(e)}")
+        self.get_application_id(rename)
     
     def select_profile_picture(self):
         """Sélectionne une photo de profil"""
@@ -786,47 +1130,26 @@ Pour les images, utilisez l'onglet Assets Manager !"""
             messagebox.showerror("Erreur", "Veuillez sélectionner une image!")
             return
             
-        app_id = self.get_application_id()
-        if not app_id:
-            messagebox.showerror("Erreur", "Token invalide ou connexion échouée!")
-            return
-            
-        try:
-            # Lire et encoder l'image
-            with open(self.selected_pp_path, 'rb') as f:
-                image_data = f.read()
-            
-            # Déterminer le type MIME
-            ext = os.path.splitext(self.selected_pp_path)[1].lower()
-            mime_types = {
-                '.png': 'image/png',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.gif': 'image/gif',
-                '.webp': 'image/webp'
-            }
-            mime_type = mime_types.get(ext, 'image/png')
-            
-            # Encoder en base64
-            b64_image = base64.b64encode(image_data).decode('utf-8')
-            avatar_data = f"data:{mime_type};base64,{b64_image}"
-            
-            headers = self.get_bot_headers()
-            data = {'icon': avatar_data}
-            
-            response = self.bot_session.patch(f'https://discord.com/api/v10/applications/{app_id}',
-                                            headers=headers, json=data)
-            
-            if response.status_code == 200:
-                messagebox.showinfo("Succès", "Avatar changé avec succès!")
-                self.pp_btn.configure(text="📷 Choisir une image")
-                self.selected_pp_path = None
-            else:
-                error_data = response.json()
-                messagebox.showerror("Erreur", f"Erreur: {error_data.get('message', 'Erreur inconnue')}")
+        path = self.selected_pp_path
+        
+        def upload(app_id):
+            # Redimensionnement et encodage de l'image dans le worker
+            def job():
+                from avatar_pipeline import build_avatar_data_uri
+                avatar_data = build_avatar_data_uri(path)
+                return self.bot_client.edit_application(app_id, icon=avatar_data)
                 
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du changement d'avatar:\n{str(e)}")
+            self.run_bot_task("Envoi de l'avatar", job,
+                              on_success=self.on_bot_avatar_changed,
+                              on_error=lambda e: self.show_bot_error(e, "Erreur lors du changement d'avatar"))
+            
+        self.get_application_id(upload)
+        
+    def on_bot_avatar_changed(self, result):
+        """Avatar envoyé avec succès"""
+        messagebox.showinfo("Succès", "Avatar changé avec succès!")
+        self.pp_btn.configure(text="📷 Choisir une image")
+        self.selected_pp_path = None
     
     # =================== ASSETS METHODS ===================
     
@@ -861,7 +1184,7 @@ Pour les images, utilisez l'onglet Assets Manager !"""
             return
         
         # Vérifier que l'application ID est disponible
-        app_id = self.application_id or self.client_id_var.get().strip()
+        app_id = self.application_id or self.client_id_var.get().split(',')[0].strip()
         if not app_id:
             messagebox.showerror("Erreur", "Veuillez d'abord vous connecter avec un token bot ou entrer un Client ID!")
             return
@@ -871,46 +1194,8 @@ Pour les images, utilisez l'onglet Assets Manager !"""
             # Car Discord ne permet plus l'ajout d'assets via l'API publique
             
             # Solution alternative : sauvegarder localement et informer l'utilisateur
-            local_assets_file = 'local_assets.json'
-            local_assets = []
-            
-            # Charger les assets locaux existants
-            if os.path.exists(local_assets_file):
-                try:
-                    with open(local_assets_file, 'r', encoding='utf-8') as f:
-                        local_assets = json.load(f)
-                except:
-                    local_assets = []
-            
-            # Copier l'image dans un dossier local
-            assets_dir = 'assets'
-            if not os.path.exists(assets_dir):
-                os.makedirs(assets_dir)
-            
-            # Générer un nom de fichier unique
-            import uuid
-            ext = os.path.splitext(self.selected_asset_path)[1]
-            unique_filename = f"{asset_name}_{str(uuid.uuid4())[:8]}{ext}"
-            local_path = os.path.join(assets_dir, unique_filename)
-            
-            # Copier le fichier
-            import shutil
-            shutil.copy2(self.selected_asset_path, local_path)
-            
-            # Ajouter à la liste locale
-            asset_info = {
-                'id': str(uuid.uuid4()),
-                'name': asset_name,
-                'local_path': local_path,
-                'original_path': self.selected_asset_path,
-                'created_at': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            local_assets.append(asset_info)
-            
-            # Sauvegarder
-            with open(local_assets_file, 'w', encoding='utf-8') as f:
-                json.dump(local_assets, f, indent=4, ensure_ascii=False)
+            record = self.asset_store.add(asset_name, self.selected_asset_path)
+            self.assets_list.add_item(record)
             
             # Message d'information
             messagebox.showinfo("Asset ajouté localement", 
@@ -927,135 +1212,282 @@ Pour les images, utilisez l'onglet Assets Manager !"""
             self.asset_name_var.set("")
             self.selected_asset_path = None
             self.asset_preview_label.configure(text="Aucune image sélectionnée")
-            self.load_assets()
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de l'ajout de l'asset:\n{str(e)}")
     
+    def import_asset_folder(self):
+        """Importe toutes les images d'un dossier en arrière-plan"""
+        folder = filedialog.askdirectory(title="Choisir un dossier d'images")
+        if not folder:
+            return
+        from bulk_import import import_images
+        
+        def progress(done, total):
+            # Appelé depuis le worker : retour dans le thread Tk
+            self.root.after(0, self.asset_import_var.set, f"⏳ Import... {done}/{total}")
+        
+        thumbnail_cache = self.assets_list.thumbnail_cache
+        self.asset_import_btn.configure(state='disabled')
+        self.task_runner.submit("Import d'assets", import_images, self.asset_store, folder, progress,
+                                None, thumbnail_cache.cache_dir, thumbnail_cache.size,
+                                on_success=self.on_assets_imported,
+                                on_error=self.on_assets_import_failed)
+        
+    def on_assets_imported(self, report):
+        """Affiche le résultat de l'import en masse"""
+        self.asset_import_btn.configure(state='normal')
+        self.asset_import_var.set(f"✅ {len(report.records)} assets importés en {report.elapsed:.1f}s"
+                                  + (f" ({len(report.errors)} ignorés)" if report.errors else ""))
+        self.load_local_assets()
+        
+        if report.errors:
+            details = "\n".join(f"• {os.path.basename(path)}: {error}" for path, error in report.errors[:10])
+            if len(report.errors) > 10:
+                details += f"\n... et {len(report.errors) - 10} autres"
+            messagebox.showwarning("Import terminé", f"Fichiers ignorés:\n{details}")
+            
+    def on_assets_import_failed(self, error):
+        self.asset_import_btn.configure(state='normal')
+        self.asset_import_var.set("")
+        messagebox.showerror("Erreur", f"Erreur lors de l'import:\n{str(error)}")
+    
     def load_assets(self):
         """Charge la liste des assets (locaux et Discord si possible)"""
-        # Vider la listbox
-        self.assets_listbox.delete(0, tk.END)
-        
-        # Charger les assets locaux
-        local_assets_file = 'local_assets.json'
-        if os.path.exists(local_assets_file):
-            try:
-                with open(local_assets_file, 'r', encoding='utf-8') as f:
-                    local_assets = json.load(f)
-                
-                for asset in local_assets:
-                    self.assets_listbox.insert(tk.END, f"📁 {asset['name']} (Local)")
-                    
-            except Exception as e:
-                print(f"Erreur chargement assets locaux: {e}")
+        self.load_local_assets()
         
         # Essayer de charger les assets Discord (si token bot disponible)
-        app_id = self.application_id or self.client_id_var.get().strip()
-        headers = self.get_bot_headers()
+        app_id = self.application_id or self.client_id_var.get().split(',')[0].strip()
+        token = self.bot_token_var.get().strip()
         
-        if app_id and headers:
-            try:
-                # Utiliser l'endpoint correct pour les applications
-                response = self.bot_session.get(f'https://discord.com/api/v10/applications/{app_id}',
-                                              headers=headers)
-                
-                if response.status_code == 200:
-                    app_data = response.json()
-                    # Discord ne retourne plus les assets via cette API
-                    # On affiche juste l'info de l'application
-                    self.assets_listbox.insert(0, f"🤖 Application: {app_data.get('name', 'Unknown')}")
-                
-            except Exception as e:
-                print(f"Erreur chargement assets Discord: {e}")
+        if app_id and token:
+            self.bot_client.token = token
+            # Utiliser l'endpoint correct pour les applications
+            self.run_bot_task("Chargement de l'application", self.bot_client.get_application, app_id,
+                              on_success=self.on_application_loaded,
+                              on_error=lambda e: print(f"Erreur chargement assets Discord: {e}"))
+            
+    @tracing.traced('ui.load_local_assets', 'ui')
+    def load_local_assets(self):
+        """Synchronise la liste avec l'index (seules les différences sont appliquées)"""
+        try:
+            self.assets_list.set_items(self.asset_store.list())
+        except Exception as e:
+            print(f"Erreur chargement assets locaux: {e}")
+            
+    def on_application_loaded(self, app_data):
+        """Affiche l'application Discord au-dessus de la liste des assets"""
+        # Discord ne retourne plus les assets via cette API
+        # On affiche juste l'info de l'application
+        self.assets_app_var.set(f"🤖 Application: {app_data.get('name', 'Unknown')}")
+    
+    def on_asset_selected(self, asset_id):
+        """Affiche la miniature de l'asset sélectionné"""
+        asset = self.asset_store.get(asset_id) if asset_id else None
+        
+        if asset is None or not asset.content_hash:
+            self.asset_thumb_hash = None
+            self.asset_thumb_label.configure(image='', text="")
+            self.asset_thumb_label.image = None
+            return
+            
+        self.asset_thumb_hash = asset.content_hash
+        self.asset_thumb_label.configure(text=f"⏳ {asset.name}")
         
-        # Si aucun asset, afficher un message d'aide
-        if self.assets_listbox.size() == 0:
-            self.assets_listbox.insert(tk.END, "Aucun asset trouvé - Ajoutez-en un!")
+        def show(image):
+            # Ignorer une miniature arrivée après un changement de sélection
+            if self.asset_thumb_hash != asset.content_hash:
+                return
+            self.asset_thumb_label.configure(image=image, text=f"  {asset.name}")
+            self.asset_thumb_label.image = image
+            
+        self.thumbnail_cache.request(asset.content_hash, asset.local_path, show)
     
     def delete_asset(self):
         """Supprime un asset sélectionné (local uniquement)"""
-        selection = self.assets_listbox.curselection()
-        if not selection:
+        asset_id = self.assets_list.selected_id
+        if not asset_id:
             messagebox.showwarning("Attention", "Veuillez sélectionner un asset à supprimer!")
             return
-            
-        selected_text = self.assets_listbox.get(selection[0])
         
-        # Vérifier si c'est un asset local
-        if not selected_text.startswith("📁"):
-            messagebox.showinfo("Info", "Seuls les assets locaux peuvent être supprimés depuis cette application.\n"
-                                      "Pour supprimer des assets Discord, utilisez le Developer Portal.")
+        asset = self.asset_store.get(asset_id)
+        if asset is None:
+            self.load_local_assets()
             return
         
-        # Extraire le nom de l'asset
-        asset_name = selected_text.replace("📁 ", "").replace(" (Local)", "")
-        
         # Confirmation
         result = messagebox.askyesno("Confirmation", 
-                                   f"Voulez-vous vraiment supprimer l'asset local '{asset_name}'?")
+                                   f"Voulez-vous vraiment supprimer l'asset local '{asset.name}'?")
         if not result:
             return
         
         try:
-            # Charger les assets locaux
-            local_assets_file = 'local_assets.json'
-            if os.path.exists(local_assets_file):
-                with open(local_assets_file, 'r', encoding='utf-8') as f:
-                    local_assets = json.load(f)
-                
-                # Trouver et supprimer l'asset
-                for i, asset in enumerate(local_assets):
-                    if asset['name'] == asset_name:
-                        # Supprimer le fichier local
-                        if os.path.exists(asset['local_path']):
-                            os.remove(asset['local_path'])
-                        
-                        # Supprimer de la liste
-                        local_assets.pop(i)
-                        break
-                
-                # Sauvegarder
-                with open(local_assets_file, 'w', encoding='utf-8') as f:
-                    json.dump(local_assets, f, indent=4, ensure_ascii=False)
-                
-                messagebox.showinfo("Succès", f"Asset local '{asset_name}' supprimé avec succès!")
-                self.load_assets()
+            # Supprimer l'asset et son fichier local
+            self.asset_store.delete(asset_id)
+            
+            self.assets_list.remove_item(asset_id)
+            self.on_asset_selected(None)
+            messagebox.showinfo("Succès", f"Asset local '{asset.name}' supprimé avec succès!")
         
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de la suppression:\n{str(e)}")
     
+    # =================== STATS METHODS ===================
+    
+    def start_metrics_server(self, port):
+        """Expose les métriques au format Prometheus sur le port local donné"""
+        server = metrics.MetricsServer(port)
+        try:
+            server.start()
+        except OSError as e:
+            print(f"Impossible d'ouvrir le port des métriques {port}: {e}")
+            return
+        self.metrics_server = server
+        self.stats_endpoint_var.set(f"Endpoint Prometheus : http://{server.host}:{server.port}/metrics")
+        
+    def start_stall_detector(self, threshold):
+        """Signale (logs, métriques, trace) les blocages de l'interface au-delà de `threshold` secondes"""
+        self.stall_detector = StallDetector(self.root, threshold)
+        self.stall_detector.start()
+        
+    @staticmethod
+    def format_bound(seconds):
+        """Borne d'histogramme lisible"""
+        if seconds == float('inf'):
+            return "> 10 s"
+        return f"≤ {seconds * 1000:.0f} ms"
+        
+    def format_presence_stats(self):
+        """Résumé des mises à jour de présence, par client ID"""
+        counts = {}
+        for (client_id, result), value in PRESENCE_UPDATES.samples():
+            counts.setdefault(client_id, {})[result] = int(value.value)
+        reconnects = {}
+        for (client_id, pipe), value in IPC_RECONNECTS.samples():
+            reconnects[client_id] = reconnects.get(client_id, 0) + int(value.value)
+        latencies = dict(PRESENCE_LATENCY.samples())
+        
+        lines = []
+        for client_id, results in sorted(counts.items()):
+            latency = latencies.get((client_id,))
+            lines.append(f"{client_id}")
+            lines.append(f"   {results.get('sent', 0)} envoyées, {results.get('skipped', 0)} inchangées, "
+                         f"{results.get('failed', 0)} échecs, {reconnects.get(client_id, 0)} reconnexions")
+            if latency:
+                lines.append(f"   latence p50 {self.format_bound(latency.quantile(0.5))}, "
+                             f"p95 {self.format_bound(latency.quantile(0.95))}")
+        throttled = sum(int(value.value) for _, value in PRESENCE_RATE_LIMITED.samples())
+        lines.append(f"Envois retardés par le quota Discord : {throttled}")
+        return "\n".join(lines)
+        
+    def format_api_stats(self):
+        """Résumé des appels REST, par route"""
+        routes = {}
+        for (route, status), value in REST_REQUESTS.samples():
+            routes.setdefault(route, {})[status] = int(value.value)
+        latencies = dict(REST_LATENCY.samples())
+        waits = dict(REST_RATE_LIMIT_WAIT.samples())
+        
+        lines = []
+        for route, statuses in sorted(routes.items()):
+            latency = latencies.get((route,))
+            wait = waits.get((route,))
+            lines.append(route)
+            lines.append(f"   {sum(statuses.values())} appels ("
+                         + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())) + ")"
+                         + (f", p95 {self.format_bound(latency.quantile(0.95))}" if latency else "")
+                         + (f", attente quota {wait.value:.1f} s" if wait else ""))
+        
+        state = self.bot_client.session.bucket_state()
+        for bucket in state['buckets']:
+            if bucket['limit'] is not None:
+                lines.append(f"Quota {bucket['bucket']} : {bucket['remaining']}/{bucket['limit']}, "
+                             f"reset dans {bucket['reset_in']:.1f} s")
+        if state['global_reset_in']:
+            lines.append(f"Limite globale : reprise dans {state['global_reset_in']:.1f} s")
+        return "\n".join(lines) or "Aucun appel"
+        
+    def format_ui_stats(self):
+        """Résumé de la réactivité de l'interface"""
+        if not self.stall_detector:
+            return "Surveillance désactivée (option --stall-threshold)"
+        lag = UI_LAG.labels()
+        stalls = int(UI_STALLS.labels().value)
+        line = (f"Retard de la boucle : p50 {self.format_bound(lag.quantile(0.5))}, "
+                f"p95 {self.format_bound(lag.quantile(0.95))}\n"
+                f"Blocages > {self.stall_detector.threshold * 1000:.0f} ms : {stalls}")
+        if stalls:
+            line += f" (pire {self.stall_detector.worst * 1000:.0f} ms)"
+        return line
+        
+    def export_trace(self):
+        """Enregistre la trace d'exécution (chrome://tracing, ui.perfetto.dev)"""
+        filename = filedialog.asksaveasfilename(title="Exporter la trace",
+                                                defaultextension=".json",
+                                                initialfile="trace.json",
+                                                filetypes=[("Trace Chrome", "*.json")])
+        if not filename:
+            return
+        try:
+            tracing.export(filename)
+            messagebox.showinfo("Trace", f"Trace enregistrée dans {filename}\n\n"
+                                         f"Ouvrez-la dans chrome://tracing ou ui.perfetto.dev")
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Impossible d'enregistrer la trace:\n{e}")
+        
+    def refresh_stats(self):
+        """Met à jour l'onglet Statistiques tant qu'il est affiché"""
+        self._stats_after = None
+        if self.notebook.select() != str(self.stats_frame):
+            return
+        self.stats_presence_var.set(self.format_presence_stats())
+        self.stats_api_var.set(self.format_api_stats())
+        self.stats_ui_var.set(self.format_ui_stats())
+        self._stats_after = self.root.after(STATS_REFRESH_MS, self.refresh_stats)
+        
     # =================== CONFIG METHODS ===================
     
+    @tracing.traced('ui.load_config', 'ui')
     def load_config(self):
         """Charge la configuration"""
-        config_file = 'advanced_rpc_config.json'
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    
-                # RPC Config
-                self.client_id_var.set(config.get('client_id', ''))
-                self.details_var.set(config.get('details', ''))
-                self.state_var.set(config.get('state', ''))
-                self.large_image_var.set(config.get('large_image', ''))
-                self.large_text_var.set(config.get('large_text', ''))
-                self.small_image_var.set(config.get('small_image', ''))
-                self.small_text_var.set(config.get('small_text', ''))
-                self.show_time_var.set(config.get('show_time', False))
-                
-                # Bot Config (ne pas charger le token pour sécurité)
-                self.bot_name_var.set(config.get('bot_name', ''))
-                
-            except Exception as e:
-                print(f"Erreur chargement config: {e}")
-    
-    def save_config(self):
-        """Sauvegarde la configuration"""
-        config = {
+        try:
+            self.apply_config(app_config.load_config())
+        except Exception as e:
+            print(f"Erreur chargement config: {e}")
+            
+    def apply_config(self, config):
+        """Recopie une configuration dans les champs de l'interface"""
+        # RPC Config
+        self.client_id_var.set(config['client_id'])
+        self.rpc_pipes_var.set(config['rpc_pipes'])
+        self.details_var.set(config['details'])
+        self.state_var.set(config['state'])
+        self.large_image_var.set(config['large_image'])
+        self.large_text_var.set(config['large_text'])
+        self.small_image_var.set(config['small_image'])
+        self.small_text_var.set(config['small_text'])
+        self.show_time_var.set(config['show_time'])
+        
+        # Profils et rotation
+        self.presence_profiles = dict(config['presence_profiles'])
+        self.refresh_profiles_list()
+        self.rotation_interval_var.set(str(config['rotation_interval']))
+        self.rotation_enabled_var.set(config['rotation_enabled'])
+        
+        # Bot Config (ne pas charger le token pour sécurité)
+        self.bot_name_var.set(config['bot_name'])
+        
+    def config_from_ui(self):
+        """Configuration correspondant à l'état actuel de l'interface"""
+        # Même forme qu'au chargement : la comparaison avec le fichier reste juste
+        try:
+            rotation_interval = app_config.parse_rotation_interval(self.rotation_interval_var.get())
+        except ValueError:
+            rotation_interval = app_config.DEFAULT_CONFIG['rotation_interval']
+        return {
             # RPC Config
             'client_id': self.client_id_var.get(),
+            'rpc_pipes': self.rpc_pipes_var.get(),
             'details': self.details_var.get(),
             'state': self.state_var.get(),
             'large_image': self.large_image_var.get(),
@@ -1063,47 +1495,146 @@ Pour les images, utilisez l'onglet Assets Manager !"""
             'small_image': self.small_image_var.get(),
             'small_text': self.small_text_var.get(),
             'show_time': self.show_time_var.get(),
+            'presence_profiles': self.presence_profiles,
+            'rotation_interval': rotation_interval,
+            'rotation_enabled': self.rotation_enabled_var.get(),
             
             # Bot Config (ne pas sauvegarder le token pour sécurité)
             'bot_name': self.bot_name_var.get(),
         }
-        
+    
+    @tracing.traced('ui.save_config', 'ui')
+    def save_config(self):
+        """Sauvegarde la configuration"""
+        if self._save_after:
+            self.root.after_cancel(self._save_after)
+            self._save_after = None
+            
         try:
-            with open('advanced_rpc_config.json', 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            app_config.save_config(self.config_from_ui())
+            self.config_watcher.mark_saved()
         except Exception as e:
             print(f"Erreur sauvegarde config: {e}")
+            
+    def bind_config_traces(self):
+        """Sauvegarde automatique à chaque modification d'un champ de la configuration"""
+        for var in (self.client_id_var, self.rpc_pipes_var,
+                    self.details_var, self.state_var,
+                    self.large_image_var, self.large_text_var,
+                    self.small_image_var, self.small_text_var,
+                    self.show_time_var, self.rotation_interval_var,
+                    self.rotation_enabled_var, self.bot_name_var):
+            var.trace_add('write', lambda *args: self.schedule_save_config())
+            
+    def schedule_save_config(self):
+        """Regroupe les modifications rapprochées en une seule écriture"""
+        if self._applying_config:
+            return
+        if self._save_after:
+            self.root.after_cancel(self._save_after)
+        self._save_after = self.root.after(int(app_config.SAVE_DEBOUNCE * 1000), self.save_config)
+        
+    def on_config_changed(self, config):
+        """Fichier de configuration modifié par un autre programme (thread Tk)"""
+        current = self.config_from_ui()
+        if all(config.get(key) == value for key, value in current.items()):
+            return
+            
+        self._applying_config = True
+        try:
+            self.apply_config(config)
+        finally:
+            self._applying_config = False
+        self.apply_rotation()
+        
+        # Nouveau client ID / instances : reconnexion si le RPC est actif
+        if self.presence_hub.active and (config['client_id'], config['rpc_pipes']) != \
+                (current['client_id'], current['rpc_pipes']):
+            try:
+                connections = parse_connections(config['client_id'], config['rpc_pipes'])
+            except ValueError as e:
+                print(f"Erreur rechargement config: {e}")
+            else:
+                if connections:
+                    self.presence_hub.connect(connections, retry=True)
+        print("Configuration rechargée")
     
     def on_closing(self):
         """Gestionnaire de fermeture"""
+        if self.stall_detector:
+            self.stall_detector.stop()
+        self.config_watcher.stop()
         self.save_config()
-        if self.rpc_connected:
-            self.disconnect_rpc()
+        # Attend la fermeture des sockets : sinon Discord garde la présence affichée
+        self.presence_hub.shutdown(timeout=RPC_CLOSE_TIMEOUT)
+        self.task_runner.shutdown()
+        if self.asset_store:
+            self.asset_store.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
         self.root.destroy()
 
-def main():
+def main(argv=None):
     """Fonction principale"""
-    # Vérifier les dépendances
-    try:
-        import pypresence
-        import requests
-        from PIL import Image, ImageTk
-    except ImportError as e:
+    imported = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Discord Bot & Rich Presence Manager")
+    parser.add_argument('--debug', action='store_true',
+                        help="messages de debug et temps de démarrage")
+    parser.add_argument('--metrics-port', type=int,
+                        help="expose les métriques Prometheus sur http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--trace', metavar='FICHIER',
+                        help="trace d'exécution (format Chrome), enregistrée à la fermeture")
+    parser.add_argument('--stall-threshold', type=float, default=STALL_THRESHOLD * 1000, metavar='MS',
+                        help="signale les blocages de l'interface plus longs (défaut: %(default).0f ms, 0: désactivé)")
+    args = parser.parse_args(argv)
+    
+    if args.trace:
+        tracing.enable()
+        # Le démarrage fait partie de la trace (temps mesurés depuis le lancement)
+        tracing.TRACER.origin = STARTUP_TIME
+        tracing.TRACER.record('startup.imports', 'ui', STARTUP_TIME, imported)
+    
+    if args.debug:
+        logging.basicConfig(level=logging.DEBUG,
+                            format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
+    # Vérifier les dépendances (sans les importer)
+    missing = [name for name in ('requests', 'PIL') if importlib.util.find_spec(name) is None]
+    if missing:
         import tkinter.messagebox as mb
         root = tk.Tk()
         root.withdraw()
-        missing_module = str(e).split("'")[1]
         mb.showerror("Module manquant", 
-                    f"Le module '{missing_module}' n'est pas installé.\n\n"
+                    f"Le module '{missing[0]}' n'est pas installé.\n\n"
                     f"Installez les dépendances avec:\n"
-                    f"pip install pypresence requests pillow")
+                    f"pip install requests pillow")
         return
     
     root = tk.Tk()
     app = DiscordAdvancedManager(root)
+    if args.metrics_port is not None:
+        app.start_metrics_server(args.metrics_port)
+    if args.stall_threshold > 0:
+        app.start_stall_detector(args.stall_threshold / 1000)
+    
+    if args.debug:
+        built = time.perf_counter()
+        
+        def report_startup():
+            # Force l'affichage en attente avant de mesurer le premier rendu
+            root.update_idletasks()
+            painted = time.perf_counter()
+            print(f"Démarrage : imports {(imported - STARTUP_TIME) * 1000:.0f} ms, "
+                  f"interface {(built - imported) * 1000:.0f} ms, "
+                  f"premier affichage {(painted - STARTUP_TIME) * 1000:.0f} ms")
+        root.after_idle(report_startup)
     
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
+    
+    if args.trace:
+        tracing.export(args.trace)
+        print(f"Trace enregistrée dans {args.trace}")
 
 if __name__ == "__main__":
     main()
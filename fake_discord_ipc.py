@@ -0,0 +1,163 @@
+"""
+Serveur IPC Discord factice
+Socket Unix parlant le protocole local de Discord (handshake, trames,
+ping), pour les benchmarks et les essais sans client Discord
+
+Usage :
+    python fake_discord_ipc.py [--dir DOSSIER] [--pipe N] [--latency MS]
+
+Les clients trouvent le serveur avec XDG_RUNTIME_DIR=DOSSIER.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from discord_ipc import HEADER, OP_CLOSE, OP_FRAME, OP_HANDSHAKE, OP_PING, OP_PONG, EventLoopThread
+
+
+async def read_frame(reader):
+    """Lit une trame (opcode, données JSON)"""
+    op, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    data = await reader.readexactly(length)
+    return op, json.loads(data.decode('utf-8'))
+
+
+def write_frame(writer, op, payload):
+    """Écrit une trame"""
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    writer.write(HEADER.pack(op, len(data)) + data)
+
+
+class FakeDiscordServer:
+    """Faux client Discord à l'écoute sur `dossier/discord-ipc-N`
+
+    Répond READY au handshake puis acquitte chaque commande après
+    `latency` secondes. Les activités reçues sont gardées dans `received`
+    sous forme (instant perf_counter, activité). Unix uniquement.
+    """
+
+    def __init__(self, directory, pipe=0, latency=0.0, loop_thread=None, on_activity=None):
+        self.path = os.path.join(directory, f'discord-ipc-{pipe}')
+        self.latency = latency
+        self.on_activity = on_activity
+        self.owns_loop = loop_thread is None
+        self.loop_thread = loop_thread or EventLoopThread(name='fake-discord-ipc')
+        self.received = []
+        self.connections = 0
+        self._server = None
+        self._writers = set()
+
+    def start(self):
+        """Ouvre le socket (bloquant jusqu'à ce qu'il écoute)"""
+        self.loop_thread.start()
+        self.loop_thread.submit(self._start()).result()
+
+    def stop(self):
+        """Ferme le socket et les connexions ouvertes"""
+        self.loop_thread.submit(self._stop()).result()
+        if self.owns_loop:
+            self.loop_thread.stop()
+
+    def clear(self):
+        """Oublie les activités reçues"""
+        self.received = []
+
+    def wait_for(self, condition, timeout):
+        """Attend que `condition()` soit vraie, retourne False après `timeout` secondes"""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    async def _start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, self.path)
+
+    async def _stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._writers):
+            writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            op, data = await read_frame(reader)
+            if op != OP_HANDSHAKE:
+                return
+            write_frame(writer, OP_FRAME, {'cmd': 'DISPATCH', 'evt': 'READY', 'nonce': None,
+                                           'data': {'v': 1, 'user': {'id': '0', 'username': 'bench'}}})
+            await writer.drain()
+
+            while True:
+                op, data = await read_frame(reader)
+                if op == OP_CLOSE:
+                    break
+                if op == OP_PING:
+                    write_frame(writer, OP_PONG, data)
+                    continue
+
+                args = data.get('args') or {}
+                if data.get('cmd') == 'SET_ACTIVITY':
+                    activity = args.get('activity')
+                    self.received.append((time.perf_counter(), activity))
+                    if self.on_activity:
+                        self.on_activity(activity)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                write_frame(writer, OP_FRAME, {'cmd': data.get('cmd'), 'evt': None,
+                                               'nonce': data.get('nonce'), 'data': args.get('activity')})
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+def main(argv=None):
+    """Lance un faux Discord en avant-plan"""
+    parser = argparse.ArgumentParser(description="Serveur IPC Discord factice (socket Unix)")
+    parser.add_argument('--dir', default=os.path.join(tempfile.gettempdir(), 'fake-discord'),
+                        help="dossier du socket, à donner en XDG_RUNTIME_DIR (défaut: %(default)s)")
+    parser.add_argument('--pipe', action='append', type=int,
+                        help="instance discord-ipc-N (répétable, défaut: 0)")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="délai avant chaque réponse, en millisecondes")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    loop_thread = EventLoopThread(name='fake-discord-ipc')
+    servers = [FakeDiscordServer(args.dir, pipe, args.latency / 1000, loop_thread,
+                                 on_activity=lambda activity, pipe=pipe: print(f"[{pipe}] {activity}", flush=True))
+               for pipe in args.pipe or [0]]
+    for server in servers:
+        server.start()
+        print(f"En écoute sur {server.path}", file=sys.stderr)
+
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    for server in servers:
+        server.stop()
+    loop_thread.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
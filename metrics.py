@@ -0,0 +1,265 @@
+"""
+Métriques de fonctionnement
+Compteurs, jauges et histogrammes en mémoire, exposés au format texte
+Prometheus par un petit serveur HTTP local (sans dépendance)
+
+    UPDATES = metrics.counter('discord_presence_updates_total', "...", ('result',))
+    UPDATES.labels('sent').inc()
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes (secondes) des histogrammes de latence
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_HOST = '127.0.0.1'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def escape_label(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+class CounterValue:
+    """Valeur d'un compteur (ne fait qu'augmenter)"""
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class GaugeValue:
+    """Valeur d'une jauge (état courant)"""
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class HistogramValue:
+    """Répartition des observations par bornes"""
+
+    def __init__(self, lock, buckets):
+        self._lock = lock
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Estimation d'un quantile (borne supérieure de la tranche qui le contient)"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+        return float('inf')
+
+
+class Metric:
+    """Métrique nommée, une valeur par combinaison de labels"""
+
+    type = None
+    value_class = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _new_value(self):
+        return self.value_class(self._lock)
+
+    def labels(self, *values):
+        """Valeur associée aux labels (créée au premier appel)"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: labels attendus {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        value = self._values.get(key)
+        if value is None:
+            with self._lock:
+                value = self._values.setdefault(key, self._new_value())
+        return value
+
+    def samples(self):
+        """Liste [(labels, valeur)]"""
+        with self._lock:
+            return list(self._values.items())
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for labels, value in sorted(self.samples()):
+            lines.extend(self.render_value(labels, value))
+        return lines
+
+    def render_value(self, labels, value):
+        return [f'{self.name}{format_labels(self.labelnames, labels)} {format_value(value.value)}']
+
+
+class Counter(Metric):
+    type = 'counter'
+    value_class = CounterValue
+
+
+class Gauge(Metric):
+    type = 'gauge'
+    value_class = GaugeValue
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_value(self):
+        return HistogramValue(self._lock, self.buckets)
+
+    def render_value(self, labels, value):
+        with self._lock:
+            counts, total, count = list(value.counts), value.sum, value.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{format_labels(self.labelnames, labels, [("le", format_value(bound))])} '
+                         f'{cumulative}')
+        suffix = format_labels(self.labelnames, labels)
+        lines.append(f'{self.name}_sum{suffix} {format_value(total)}')
+        lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques d'un processus"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Enregistre une métrique (une seule par nom)"""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Exposition au format texte Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, help_text, labelnames=(), registry=REGISTRY):
+    """Déclare un compteur"""
+    return registry.register(Counter(name, help_text, labelnames))
+
+
+def gauge(name, help_text, labelnames=(), registry=REGISTRY):
+    """Déclare une jauge"""
+    return registry.register(Gauge(name, help_text, labelnames))
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+    """Déclare un histogramme"""
+    return registry.register(Histogram(name, help_text, labelnames, buckets))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer:
+    """Point d'accès HTTP local pour Prometheus (thread de fond)"""
+
+    def __init__(self, port, host=METRICS_HOST, registry=REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server = None
+
+    def start(self):
+        """Ouvre le port (OSError s'il est déjà utilisé)"""
+        self._server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+
+    def stop(self):
+        """Ferme le port"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
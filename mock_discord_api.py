@@ -0,0 +1,237 @@
+"""
+API REST Discord factice
+Serveur HTTP local imitant les routes du Bot Manager, avec latence,
+rate limits (X-RateLimit-*, 429 + retry_after) et statistiques
+
+Usage :
+    python mock_discord_api.py [--port 8080] [--latency MS] [--limit 5/1] [--throttle-every N]
+
+L'application se branche dessus avec :
+    DISCORD_API_BASE=http://127.0.0.1:8080/api/v10 python discord_manager_advanced.py
+"""
+
+import argparse
+import collections
+import json
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_PREFIX = '/api/v10'
+APPLICATION_ID = '123456789012345678'
+
+APPLICATION_ROUTE = re.compile(r'^/applications/(\d+)$')
+
+
+class MockDiscordAPI:
+    """Faux Discord REST sur un port local (0 : port libre choisi par le système)
+
+    `limit`/`window` : quota par route (X-RateLimit-*), au-delà réponse 429.
+    `throttle_every` : une requête sur N reçoit un 429 (`retry_after` secondes),
+    quel que soit le quota. `stats` compte requêtes, connexions, 429 et octets reçus.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, limit=None, window=1.0,
+                 throttle_every=0, retry_after=0.05):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.application = {'id': APPLICATION_ID, 'name': 'Bench Bot', 'icon': None, 'description': ''}
+        self.stats = collections.Counter()
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._server = None
+        self._thread = None
+
+    @property
+    def api_base(self):
+        return f'http://{self.host}:{self.port}{API_PREFIX}'
+
+    def start(self):
+        """Démarre le serveur dans un thread de fond"""
+        self._server = ThreadingHTTPServer((self.host, self.port), MockRequestHandler)
+        self._server.daemon_threads = True
+        self._server.api = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-discord-api', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le serveur"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_stats(self):
+        """Remet les compteurs et les quotas à zéro"""
+        with self._lock:
+            self.stats = collections.Counter()
+            self._windows = {}
+
+    def count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def rate_limit(self, route):
+        """Applique le quota de la route : retourne (headers, retry_after ou None)"""
+        with self._lock:
+            self.stats['requests'] += 1
+            if self.throttle_every and self.stats['requests'] % self.throttle_every == 0:
+                self.stats['throttled'] += 1
+                return {}, self.retry_after
+            if not self.limit:
+                return {}, None
+
+            now = time.monotonic()
+            reset_at, used = self._windows.get(route, (0.0, 0))
+            if now >= reset_at:
+                reset_at, used = now + self.window, 0
+            used += 1
+            self._windows[route] = (reset_at, used)
+
+            headers = {
+                'X-RateLimit-Limit': str(self.limit),
+                'X-RateLimit-Remaining': str(max(0, self.limit - used)),
+                'X-RateLimit-Reset-After': f'{reset_at - now:.3f}',
+                'X-RateLimit-Bucket': f'{zlib.crc32(route.encode()):08x}',
+            }
+            if used > self.limit:
+                self.stats['throttled'] += 1
+                return headers, reset_at - now
+            return headers, None
+
+    def handle(self, method, path, headers, body):
+        """Traite une requête, retourne (statut, données JSON)"""
+        if not (headers.get('Authorization') or '').startswith('Bot '):
+            return 401, {'message': '401: Unauthorized', 'code': 0}
+
+        if path == '/oauth2/applications/@me' and method == 'GET':
+            return 200, self.application
+
+        match = APPLICATION_ROUTE.match(path)
+        if match is None:
+            return 404, {'message': 'Unknown route', 'code': 0}
+        if match.group(1) != APPLICATION_ID:
+            return 404, {'message': 'Unknown Application', 'code': 10002}
+        if method == 'GET':
+            return 200, self.application
+        if method == 'PATCH':
+            try:
+                fields = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'message': 'Invalid JSON', 'code': 50109}
+            icon = fields.get('icon')
+            if icon is not None and not str(icon).startswith('data:image/'):
+                return 400, {'message': 'Invalid Form Body', 'code': 50035}
+            with self._lock:
+                self.application = dict(self.application, **{
+                    key: value for key, value in fields.items() if key in ('name', 'description')})
+                if icon is not None:
+                    self.application['icon'] = f'{len(icon):x}'
+            return 200, self.application
+        return 405, {'message': '405: Method Not Allowed', 'code': 0}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Requêtes HTTP/1.1 (keep-alive) vers MockDiscordAPI"""
+
+    protocol_version = 'HTTP/1.1'
+    # Réponse écrite d'un seul bloc (en-têtes + corps) : sinon l'ACK retardé
+    # du client ajoute ~40 ms à chaque requête en keep-alive
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # Une instance par connexion TCP : mesure la réutilisation des connexions
+        self.server.api.count('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_PATCH(self):
+        self.dispatch()
+
+    def dispatch(self):
+        api = self.server.api
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        api.count('bytes_in', length)
+
+        if api.latency:
+            time.sleep(api.latency)
+
+        path = self.path.split('?', 1)[0]
+        if not path.startswith(API_PREFIX):
+            return self.send_json(404, {'message': 'Unknown route', 'code': 0})
+        path = path[len(API_PREFIX):]
+
+        # Route au sens Discord : les ids d'application partagent un quota
+        headers, retry_after = api.rate_limit(f'{self.command} {APPLICATION_ROUTE.sub("/applications/:id", path)}')
+        if retry_after is not None:
+            headers['Retry-After'] = f'{retry_after:.3f}'
+            return self.send_json(429, {'message': 'You are being rate limited.',
+                                        'retry_after': retry_after, 'global': False}, headers)
+
+        status, data = api.handle(self.command, path, self.headers, body)
+        self.send_json(status, data, headers)
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def parse_limit(value):
+    """Quota « N/secondes » (ex: 5/1) en (N, secondes)"""
+    try:
+        limit, _, window = value.partition('/')
+        return int(limit), float(window or 1.0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"quota invalide: {value} (attendu: N/secondes)")
+
+
+def main(argv=None):
+    """Lance le faux Discord REST en avant-plan"""
+    parser = argparse.ArgumentParser(description="API REST Discord factice (Bot Manager)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="latence par requête, en millisecondes")
+    parser.add_argument('--limit', type=parse_limit, help="quota par route, ex: 5/1 (5 requêtes par seconde)")
+    parser.add_argument('--throttle-every', type=int, default=0, help="une requête sur N reçoit un 429")
+    parser.add_argument('--retry-after', type=float, default=0.05, help="retry_after des 429 injectés (secondes)")
+    args = parser.parse_args(argv)
+
+    limit, window = args.limit or (None, 1.0)
+    api = MockDiscordAPI(args.host, args.port, args.latency / 1000, limit, window,
+                         args.throttle_every, args.retry_after)
+    api.start()
+    print(f"API factice sur {api.api_base}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    api.stop()
+    print(dict(api.stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
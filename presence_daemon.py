@@ -0,0 +1,154 @@
+"""
+Discord Rich Presence - mode sans interface
+Lance la présence définie dans advanced_rpc_config.json (sans tkinter ni Pillow)
+
+Usage :
+    python presence_daemon.py [--config advanced_rpc_config.json] [--client-id ID] [--pipe N]
+
+Plusieurs --client-id et --pipe peuvent être donnés : chaque client ID est
+connecté à chaque instance Discord, le tout dans un seul thread.
+
+Les modifications du fichier de configuration sont appliquées à chaud.
+"""
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+import app_config
+import metrics
+import tracing
+from presence_engine import PresenceHub, PresenceSnapshot, parse_connections
+
+logger = logging.getLogger('presence_daemon')
+
+
+def config_connections(config, args):
+    """Connexions demandées (la ligne de commande a priorité sur la config)"""
+    client_ids = ','.join(args.client_id) if args.client_id else config.get('client_id')
+    pipes = ','.join(map(str, args.pipe)) if args.pipe else config.get('rpc_pipes')
+    return parse_connections(client_ids, pipes)
+
+
+def apply_presence(hub, config):
+    """Publie la présence et la rotation de profils décrites par la config"""
+    hub.publish(PresenceSnapshot.from_dict(config))
+
+    # Rotation des profils enregistrés depuis l'interface
+    profiles = config.get('presence_profiles') or {}
+    if config.get('rotation_enabled') and len(profiles) >= 2:
+        interval = config['rotation_interval']
+        hub.start_rotation([(PresenceSnapshot.from_dict(fields), interval) for fields in profiles.values()])
+        logger.info("Rotation de %d profils toutes les %gs", len(profiles), interval)
+    elif hub.rotation_profiles:
+        hub.stop_rotation()
+
+
+def main(argv=None):
+    """Point d'entrée du mode daemon / CLI"""
+    parser = argparse.ArgumentParser(description="Discord Rich Presence sans interface graphique")
+    parser.add_argument('--config', default=app_config.CONFIG_FILE,
+                        help="fichier de configuration (défaut: %(default)s)")
+    parser.add_argument('--client-id', action='append',
+                        help="remplace le client_id de la configuration (répétable)")
+    parser.add_argument('--pipe', action='append', type=int,
+                        help="instance Discord discord-ipc-N (répétable, défaut: première disponible)")
+    parser.add_argument('--wait', action='store_true',
+                        help="attendre que Discord soit lancé au lieu d'échouer au démarrage")
+    parser.add_argument('--metrics-port', type=int,
+                        help="expose les métriques Prometheus sur http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--trace', metavar='FICHIER',
+                        help="enregistre une trace d'exécution (format Chrome) à l'arrêt")
+    parser.add_argument('-v', '--verbose', action='store_true', help="affiche les messages de debug")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.trace:
+        tracing.enable()
+
+    try:
+        config = app_config.load_config(args.config)
+    except Exception as e:
+        logger.error("Erreur chargement config: %s", e)
+        return 1
+
+    try:
+        connections = config_connections(config, args)
+    except ValueError as e:
+        logger.error("%s", e)
+        return 1
+    if not connections:
+        logger.error("Aucun client_id dans %s (utilisez --client-id)", args.config)
+        return 1
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = metrics.MetricsServer(args.metrics_port)
+        try:
+            metrics_server.start()
+        except OSError as e:
+            logger.error("Impossible d'ouvrir le port des métriques %d: %s", args.metrics_port, e)
+            return 1
+        logger.info("Métriques sur http://%s:%d/metrics", metrics_server.host, metrics_server.port)
+
+    hub = PresenceHub()
+    hub.start()
+    apply_presence(hub, config)
+
+    # Les reconnexions (redémarrage de Discord) sont gérées par le moteur
+    hub.add_listener(lambda engine, state: logger.debug("%s: %s", engine.target and engine.target[0], state))
+
+    for (client_id, pipe), error in hub.connect(connections, retry=args.wait).result():
+        if error is not None:
+            logger.error("Impossible de se connecter (%s, instance %s): %s",
+                         client_id, 'auto' if pipe is None else pipe, error)
+    if not hub.active:
+        hub.stop()
+        if metrics_server:
+            metrics_server.stop()
+        return 1
+
+    # Rechargement à chaud (ex: configuration poussée par un script)
+    def on_config_changed(new_config):
+        nonlocal connections
+        logger.info("Configuration rechargée")
+        apply_presence(hub, new_config)
+        try:
+            new_connections = config_connections(new_config, args)
+        except ValueError as e:
+            logger.error("%s", e)
+            return
+        if new_connections and new_connections != connections:
+            connections = new_connections
+            hub.connect(connections, retry=True)
+
+    watcher = app_config.ConfigWatcher(on_config_changed, args.config)
+    watcher.start()
+
+    # Arrêt propre sur Ctrl+C / SIGTERM
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    # Attente par intervalles pour rester réactif aux signaux sous Windows
+    while not stop_event.wait(1.0):
+        pass
+
+    watcher.stop()
+    hub.shutdown()
+    if metrics_server:
+        metrics_server.stop()
+    if args.trace:
+        tracing.export(args.trace)
+        logger.info("Trace enregistrée dans %s", args.trace)
+    logger.info("Présence arrêtée")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,702 @@
+"""
+Moteur de Rich Presence
+Connexion, détection des changements et envoi, sans interface graphique
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+
+import metrics
+import tracing
+from discord_ipc import AsyncDiscordIPC, EventLoopThread
+from presence_templates import TEMPLATE_TICK, PresenceTemplate, TemplateContext
+
+logger = logging.getLogger(__name__)
+
+# Champs texte de la présence, dans l'ordre canonique
+PRESENCE_FIELDS = ('details', 'state', 'large_image', 'large_text', 'small_image', 'small_text')
+
+# Champs pouvant contenir des variables ({time}, {uptime}...)
+TEMPLATE_FIELDS = ('details', 'state', 'large_text', 'small_text')
+
+# Délai de regroupement des modifications avant envoi (secondes)
+DEBOUNCE_DELAY = 0.3
+
+# Limite Discord : environ 5 mises à jour par fenêtre de 20 secondes
+RATE_LIMIT_CALLS = 5
+RATE_LIMIT_PERIOD = 20.0
+
+# Intervalle minimum de rotation : au-delà du quota, les profils seraient sautés
+MIN_ROTATION_INTERVAL = RATE_LIMIT_PERIOD / RATE_LIMIT_CALLS
+
+# Nombre de payloads précalculés gardés en cache
+PREPARED_CACHE_SIZE = 64
+
+# Reconnexion : délai de base doublé à chaque échec, plafonné (secondes)
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+# Attente maximum de la fermeture des connexions à l'arrêt (secondes)
+CLOSE_TIMEOUT = 2.0
+
+# États d'une connexion
+STATE_DISCONNECTED = 'disconnected'
+STATE_CONNECTING = 'connecting'
+STATE_CONNECTED = 'connected'
+STATE_RECONNECTING = 'reconnecting'
+
+# Métriques (voir metrics.MetricsServer)
+PRESENCE_UPDATES = metrics.counter('discord_presence_updates_total',
+                                   "Mises à jour de présence par résultat (sent, skipped, failed)",
+                                   ('client_id', 'result'))
+PRESENCE_LATENCY = metrics.histogram('discord_presence_update_seconds',
+                                     "Durée d'un SET_ACTIVITY, acquittement de Discord compris",
+                                     ('client_id',))
+PRESENCE_RATE_LIMITED = metrics.counter('discord_presence_rate_limited_total',
+                                        "Envois retardés par le quota Discord (5 mises à jour / 20 s)")
+IPC_CONNECTED = metrics.gauge('discord_ipc_connected', "1 si la connexion IPC est établie",
+                              ('client_id', 'pipe'))
+IPC_RECONNECTS = metrics.counter('discord_ipc_reconnects_total', "Reconnexions IPC réussies après une perte",
+                                 ('client_id', 'pipe'))
+
+
+def backoff_delay(attempt, base=RECONNECT_BASE_DELAY, maximum=RECONNECT_MAX_DELAY):
+    """Délai avant la tentative `attempt` (0 : immédiat), exponentiel avec jitter
+
+    Le jitter évite que plusieurs clients relancent Discord au même instant.
+    """
+    if attempt <= 0:
+        return 0.0
+    return min(maximum, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+class PresenceSnapshot(collections.namedtuple('PresenceSnapshot', PRESENCE_FIELDS + ('show_time',))):
+    """Photo immuable des champs de la présence
+
+    Publiée depuis le thread de l'interface et lue par la boucle d'envoi
+    sans jamais toucher aux variables Tk.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, fields):
+        """Construit une photo à partir d'un dict (config, variables Tk...)"""
+        return cls(*(fields.get(key) or '' for key in PRESENCE_FIELDS),
+                   show_time=bool(fields.get('show_time', False)))
+
+
+class PresenceModel:
+    """Modèle de présence avec détection des changements"""
+
+    def __init__(self):
+        self.start_timestamp = None
+        self.last_sent_hash = None
+        # Cache {photo: (payload sans début du chrono, empreinte)}
+        self._prepared = collections.OrderedDict()
+
+    @staticmethod
+    def fields_payload(snapshot):
+        """Champs texte canoniques d'une photo (sans le début du chrono)"""
+        payload = {}
+        for key in PRESENCE_FIELDS:
+            value = getattr(snapshot, key).strip()
+            if value:
+                payload[key] = value
+        return payload
+
+    def start_time(self, snapshot):
+        """Début du chrono à envoyer avec la photo (None si l'option est inactive)
+
+        Le début reste stable tant que l'option est active, sinon Discord
+        remet le temps écoulé à zéro à chaque envoi.
+        """
+        if not snapshot.show_time:
+            self.start_timestamp = None
+        elif self.start_timestamp is None:
+            self.start_timestamp = int(time.time())
+        return self.start_timestamp
+
+    def build_payload(self, snapshot):
+        """Construit le payload canonique à partir d'une photo de la présence"""
+        payload, _ = self.payload_for(snapshot)
+        return payload
+
+    def prepare(self, snapshot):
+        """Champs et empreinte d'une photo, précalculés une seule fois
+
+        Une rotation de profils réutilise toujours les mêmes photos : chaque
+        envoi se résume alors à une recherche dans le cache. Ne touche pas
+        au chrono : le précalcul d'un profil ne doit pas le remettre à zéro.
+        """
+        prepared = self._prepared.get(snapshot)
+        if prepared is None:
+            payload = self.fields_payload(snapshot)
+            prepared = self._prepared[snapshot] = (payload, self.payload_hash(payload))
+            if len(self._prepared) > PREPARED_CACHE_SIZE:
+                self._prepared.popitem(last=False)
+        else:
+            self._prepared.move_to_end(snapshot)
+        return prepared
+
+    def payload_for(self, snapshot):
+        """Payload à envoyer et son empreinte (début du chrono ajouté au moment de l'envoi)"""
+        payload, digest = self.prepare(snapshot)
+        start = self.start_time(snapshot)
+        if start is not None:
+            payload = dict(payload, start=start)
+            digest = self.payload_hash(payload)
+        return payload, digest
+
+    @staticmethod
+    def payload_hash(payload):
+        """Calcule l'empreinte canonique d'un payload"""
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+    def needs_update(self, payload):
+        """Indique si le payload diffère du dernier envoyé"""
+        return self.payload_hash(payload) != self.last_sent_hash
+
+    def mark_sent(self, payload, digest=None):
+        """Mémorise le payload qui vient d'être envoyé"""
+        self.last_sent_hash = digest or self.payload_hash(payload)
+
+    def invalidate(self):
+        """Force le prochain envoi (ex: après une reconnexion)"""
+        self.last_sent_hash = None
+
+
+class RateLimiter:
+    """Limiteur à fenêtre glissante (N appels par période)"""
+
+    def __init__(self, max_calls=RATE_LIMIT_CALLS, period=RATE_LIMIT_PERIOD):
+        self.max_calls = max_calls
+        self.period = period
+        self.calls = collections.deque()
+
+    def delay(self, now=None):
+        """Retourne le temps d'attente avant le prochain appel autorisé"""
+        now = time.monotonic() if now is None else now
+        while self.calls and now - self.calls[0] >= self.period:
+            self.calls.popleft()
+        if len(self.calls) < self.max_calls:
+            return 0.0
+        return self.calls[0] + self.period - now
+
+    def record(self, now=None):
+        """Enregistre un appel"""
+        self.calls.append(time.monotonic() if now is None else now)
+
+
+class PresencePusher:
+    """Envoi des mises à jour de présence, regroupées après un court délai
+
+    Tourne dans la boucle asyncio de `loop_thread`. `send` est une
+    coroutine qui retourne True si une mise à jour a réellement été
+    transmise à Discord.
+    """
+
+    def __init__(self, loop_thread, send, debounce=DEBOUNCE_DELAY, rate_limiter=None):
+        self.loop_thread = loop_thread
+        self.send = send
+        self.debounce = debounce
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self._running = False
+        self._pending = False
+        self._sending = False
+        self._deferred = False
+        self._last_change = 0.0
+        self._handle = None
+
+    def start(self):
+        """Active l'envoi des mises à jour"""
+        self._running = True
+
+    def stop(self):
+        """Désactive l'envoi et annule la mise à jour planifiée"""
+        self._running = False
+        self.loop_thread.call_soon(self._cancel)
+
+    def notify(self, immediate=False):
+        """Signale une modification de la présence (depuis n'importe quel thread)
+
+        `immediate` : pas de délai de regroupement (changement non issu d'une saisie).
+        """
+        self.loop_thread.call_soon(self._on_change, immediate)
+
+    # Méthodes exécutées dans la boucle asyncio
+
+    def _cancel(self):
+        self._pending = False
+        self._deferred = False
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+    def _on_change(self, immediate=False):
+        if not self._running:
+            return
+        self._pending = True
+        self._last_change = time.monotonic() - (self.debounce if immediate else 0)
+        # Pendant un envoi, la replanification se fait à la fin de celui-ci
+        if not self._sending:
+            self._schedule()
+
+    def _schedule(self):
+        """Attend la fin de la saisie puis le quota Discord"""
+        if self._handle:
+            self._handle.cancel()
+        now = time.monotonic()
+        debounce = self._last_change + self.debounce - now
+        quota = self.rate_limiter.delay(now)
+        # Une saisie pendant l'attente replanifie le même envoi : compté une seule fois
+        if quota > max(debounce, 0) and not self._deferred:
+            self._deferred = True
+            PRESENCE_RATE_LIMITED.labels().inc()
+        delay = max(debounce, quota, 0)
+        self._handle = self.loop_thread.loop.call_later(delay, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        self._deferred = False
+        if not self._running or not self._pending:
+            return
+        self._pending = False
+        self._sending = True
+        asyncio.ensure_future(self._send())
+
+    async def _send(self):
+        try:
+            if await self.send():
+                self.rate_limiter.record()
+        except Exception as e:
+            logger.error("Erreur envoi présence: %s", e)
+        finally:
+            self._sending = False
+            if self._running and self._pending:
+                self._schedule()
+
+
+class PresenceRotation:
+    """Rotation de profils de présence, planifiée dans la boucle du moteur
+
+    Un seul timer (échéance absolue) est armé pour le prochain profil. Si
+    plusieurs échéances sont dépassées d'un coup (boucle bloquée, machine
+    en veille), elles sont regroupées : seul le profil courant est publié.
+    Le quota Discord reste garanti par le PresencePusher.
+    """
+
+    def __init__(self, engine, min_interval=MIN_ROTATION_INTERVAL):
+        self.engine = engine
+        self.min_interval = min_interval
+        self.profiles = ()
+        self.index = 0
+        self._deadline = 0.0
+        self._handle = None
+
+    @property
+    def running(self):
+        return bool(self.profiles)
+
+    def start(self, profiles):
+        """Démarre la rotation sur une liste de (PresenceSnapshot, durée en secondes)"""
+        profiles = tuple((snapshot, max(float(duration), self.min_interval))
+                         for snapshot, duration in profiles)
+        self.engine.loop_thread.call_soon(self._start, profiles)
+
+    def stop(self):
+        """Arrête la rotation (la présence courante reste affichée)"""
+        self.engine.loop_thread.call_soon(self._start, ())
+
+    # Méthodes exécutées dans la boucle asyncio
+
+    def _start(self, profiles):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        self.profiles = profiles
+        self.index = 0
+        if not profiles:
+            return
+
+        # Précalcul des payloads : chaque rotation sera un simple envoi
+        model = self.engine.model
+        for snapshot, _ in profiles:
+            model.prepare(snapshot)
+
+        self._deadline = time.monotonic()
+        self._rotate()
+
+    def _rotate(self):
+        self._handle = None
+        if not self.profiles:
+            return
+
+        # Échéances manquées : on avance sans publier les profils intermédiaires
+        now = time.monotonic()
+        snapshot, duration = self.profiles[self.index]
+        while self._deadline + duration <= now:
+            self._deadline += duration
+            self.index = (self.index + 1) % len(self.profiles)
+            snapshot, duration = self.profiles[self.index]
+
+        self.engine.publish(snapshot, immediate=True)
+        self._deadline += duration
+        self.index = (self.index + 1) % len(self.profiles)
+        self._handle = self.engine.loop_thread.loop.call_later(self._deadline - now, self._rotate)
+
+
+class PresenceEngine:
+    """Moteur de Rich Presence indépendant de l'interface graphique
+
+    Les champs sont fournis par `publish()` sous forme de PresenceSnapshot.
+    Les variables des champs texte sont réévaluées tous les `template_tick`
+    secondes dans la boucle asyncio, seulement si l'une d'elles dépend du temps.
+
+    Une fois connecté, un superviseur surveille la connexion : si Discord
+    redémarre, il se reconnecte (backoff exponentiel) et renvoie la
+    dernière présence. Les `listeners(engine, state)` sont appelés à chaque
+    changement d'état, depuis la boucle asyncio.
+    """
+
+    def __init__(self, loop_thread=None, template_tick=TEMPLATE_TICK):
+        self.snapshot = PresenceSnapshot.from_dict({})
+        # Une boucle fournie (partagée) n'est pas arrêtée par stop()
+        self.owns_loop = loop_thread is None
+        self.templates = TemplateContext()
+        self.template_tick = template_tick
+        self._template = PresenceTemplate(self.snapshot, self.templates, TEMPLATE_FIELDS)
+        self._template_lock = threading.Lock()
+        self.loop_thread = loop_thread or EventLoopThread()
+        self.model = PresenceModel()
+        self.pusher = PresencePusher(self.loop_thread, self.update_presence)
+        self.rotation = PresenceRotation(self)
+        self.client = None
+        self.connected = False
+        self.state = STATE_DISCONNECTED
+        self.last_error = None
+        self.reconnect_attempt = 0
+        self.listeners = []
+        # (client_id, pipe) tant que la connexion est souhaitée
+        self.target = None
+        self._supervisor = None
+        self._tick_handle = None
+        self._ticking = False
+        self._metric_labels = None
+
+    def start(self):
+        """Démarre la boucle asyncio du moteur"""
+        self.loop_thread.start()
+        self._ticking = True
+        self.loop_thread.call_soon(self._update_tick)
+
+    def stop(self):
+        """Arrête le moteur (et sa boucle asyncio s'il en est propriétaire)"""
+        self.rotation.stop()
+        self.target = None
+        self._ticking = False
+        self.loop_thread.call_soon(self._cancel_tasks)
+        if self.owns_loop:
+            self.loop_thread.stop()
+
+    def connect(self, client_id, pipe=None, retry=False):
+        """Lance la connexion, retourne un concurrent.futures.Future
+
+        `pipe` : numéro du socket discord-ipc-N (None : le premier disponible).
+        `retry` : en cas d'échec, réessayer en arrière-plan au lieu d'échouer
+        (Discord pas encore lancé).
+        """
+        return self.loop_thread.submit(self._connect(client_id, pipe, retry))
+
+    @tracing.traced('presence.connect', 'presence')
+    async def _connect(self, client_id, pipe=None, retry=False):
+        self._cancel_supervisor()
+        self.target = (client_id, pipe)
+        self._metric_labels = (client_id, 'auto' if pipe is None else pipe)
+        self.reconnect_attempt = 0
+        self._set_state(STATE_CONNECTING)
+        if not retry:
+            try:
+                await self._open_client(client_id, pipe)
+            except Exception as e:
+                self.target = None
+                self._set_state(STATE_DISCONNECTED, e)
+                raise
+        self._supervisor = asyncio.ensure_future(self._supervise())
+
+    @tracing.traced('ipc.connect', 'ipc')
+    async def _open_client(self, client_id, pipe):
+        client = AsyncDiscordIPC(client_id, pipe)
+        await client.connect()
+        self.client = client
+        logger.info("RPC connecté (%s, %s)", client.client_id, client.path)
+        self.reconnect_attempt = 0
+        self._set_state(STATE_CONNECTED)
+
+        # Nouvelle connexion : la dernière présence doit être renvoyée
+        self.model.invalidate()
+        self.pusher.start()
+        self.pusher.notify(immediate=True)
+
+    async def _supervise(self):
+        """Surveille la connexion et la rétablit tant qu'elle est souhaitée"""
+        lost = False
+        while self.target is not None:
+            if self.state == STATE_CONNECTED:
+                await self.client.wait_closed()
+                if self.target is None:
+                    break
+                logger.warning("Connexion RPC perdue (%s), reconnexion...", self.target[0])
+                client, self.client = self.client, None
+                await client.close()
+                lost = True
+
+            delay = backoff_delay(self.reconnect_attempt)
+            self.reconnect_attempt += 1
+            self._set_state(STATE_RECONNECTING, self.last_error)
+            await asyncio.sleep(delay)
+            try:
+                await self._open_client(*self.target)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = e
+                logger.debug("Reconnexion impossible (tentative %d): %s", self.reconnect_attempt, e)
+            else:
+                if lost:
+                    IPC_RECONNECTS.labels(*self._metric_labels).inc()
+
+    def _set_state(self, state, error=None):
+        self.state = state
+        self.connected = state == STATE_CONNECTED
+        self.last_error = error
+        if self._metric_labels:
+            IPC_CONNECTED.labels(*self._metric_labels).set(1 if self.connected else 0)
+        for listener in list(self.listeners):
+            try:
+                listener(self, state)
+            except Exception as e:
+                logger.error("Erreur listener de connexion: %s", e)
+
+    def _cancel_supervisor(self):
+        if self._supervisor:
+            self._supervisor.cancel()
+            self._supervisor = None
+
+    def disconnect(self):
+        """Ferme la connexion et arrête la reconnexion, retourne un Future"""
+        self.target = None
+        self.connected = False
+        self.pusher.stop()
+        return self.loop_thread.submit(self._disconnect())
+
+    async def _disconnect(self):
+        self._cancel_supervisor()
+        client, self.client = self.client, None
+        if client:
+            await client.close()
+        self._set_state(STATE_DISCONNECTED)
+
+    def publish(self, snapshot, immediate=False):
+        """Publie une nouvelle photo de la présence (depuis n'importe quel thread)"""
+        # Les modèles sont compilés ici (avec cache), pas à chaque tick
+        template = PresenceTemplate(snapshot, self.templates, TEMPLATE_FIELDS)
+        with self._template_lock:
+            previous, self._template = self._template, template
+            # Remplacement de référence : lu sans verrou par la boucle d'envoi
+            self.snapshot = template.render()
+        if self._ticking and template.time_dependent != previous.time_dependent:
+            self.loop_thread.call_soon(self._update_tick)
+        if self.connected:
+            self.pusher.notify(immediate)
+
+    def _update_tick(self):
+        """Arme le tick si le modèle courant dépend du temps, sinon le désarme"""
+        needed = self._ticking and self._template.time_dependent
+        if needed and self._tick_handle is None:
+            self._tick_handle = self.loop_thread.loop.call_later(self.template_tick, self._tick)
+        elif not needed and self._tick_handle is not None:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+
+    def _cancel_tasks(self):
+        self._cancel_supervisor()
+        if self._tick_handle:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+
+    def _tick(self):
+        """Réévalue les variables des modèles (boucle asyncio)"""
+        self._tick_handle = None
+        self._update_tick()
+        self.templates.tick()
+        with self._template_lock:
+            if not self._template.dynamic:
+                return
+            rendered = self._template.render()
+            if rendered is None:
+                return
+            self.snapshot = rendered
+        if self.connected:
+            self.pusher.notify(immediate=True)
+
+    @tracing.traced('presence.update', 'presence')
+    async def update_presence(self):
+        """Met à jour la Rich Presence (retourne True si envoyée)"""
+        if not self.connected or not self.client:
+            return False
+
+        payload, digest = self.model.payload_for(self.snapshot)
+        client_id = self.client.client_id
+
+        # Rien à envoyer si la présence n'a pas changé
+        if digest == self.model.last_sent_hash:
+            PRESENCE_UPDATES.labels(client_id, 'skipped').inc()
+            return False
+
+        start = time.perf_counter()
+        try:
+            with tracing.span('rpc.set_activity', 'ipc', client_id=client_id):
+                await self.client.set_activity(payload)
+        except Exception:
+            PRESENCE_UPDATES.labels(client_id, 'failed').inc()
+            raise
+        PRESENCE_LATENCY.labels(client_id).observe(time.perf_counter() - start)
+        PRESENCE_UPDATES.labels(client_id, 'sent').inc()
+        self.model.mark_sent(payload, digest)
+        return True
+
+
+def parse_connections(client_ids, pipes=''):
+    """Liste des connexions (client_id, pipe) à partir de listes séparées par des virgules
+
+    Chaque client ID est connecté à chaque instance Discord demandée.
+    Sans pipe, la première instance disponible est utilisée.
+    """
+    ids = [cid.strip() for cid in str(client_ids or '').split(',') if cid.strip()]
+    numbers = []
+    for pipe in str(pipes or '').split(','):
+        pipe = pipe.strip()
+        if not pipe:
+            continue
+        if not pipe.isdigit() or int(pipe) > 9:
+            raise ValueError(f"Numéro d'instance invalide: {pipe} (0 à 9)")
+        numbers.append(int(pipe))
+    return [(cid, pipe) for cid in ids for pipe in (numbers or [None])]
+
+
+class PresenceHub:
+    """Plusieurs connexions de présence (client IDs, instances Discord)
+
+    Chaque connexion a son propre moteur (modèle, quota, rotation) mais
+    toutes partagent la même boucle asyncio et donc un seul thread.
+    """
+
+    def __init__(self, loop_thread=None):
+        self.loop_thread = loop_thread or EventLoopThread()
+        self.engines = {}
+        self.snapshot = PresenceSnapshot.from_dict({})
+        self.rotation_profiles = ()
+        self.listeners = []
+
+    @property
+    def connected(self):
+        return any(engine.connected for engine in self.engines.values())
+
+    @property
+    def active(self):
+        """Au moins une connexion est souhaitée (connectée ou en reconnexion)"""
+        return any(engine.target is not None for engine in self.engines.values())
+
+    def add_listener(self, listener):
+        """`listener(engine, state)` pour toutes les connexions, présentes et futures"""
+        self.listeners.append(listener)
+        for engine in self.engines.values():
+            engine.listeners.append(listener)
+
+    def start(self):
+        """Démarre la boucle asyncio partagée"""
+        self.loop_thread.start()
+
+    def stop(self):
+        """Arrête tous les moteurs et la boucle"""
+        for engine in self.engines.values():
+            engine.stop()
+        self.loop_thread.stop()
+
+    def shutdown(self, timeout=CLOSE_TIMEOUT):
+        """Ferme les connexions (en attendant au plus `timeout` secondes) puis arrête la boucle
+
+        La fermeture demande plusieurs tours de boucle : arrêtée trop tôt,
+        le socket resterait ouvert et Discord continuerait d'afficher la présence.
+        """
+        concurrent.futures.wait(self.disconnect(), timeout)
+        self.stop()
+
+    def add(self, client_id, pipe=None):
+        """Ajoute une connexion (non connectée) et retourne son moteur"""
+        key = (str(client_id), pipe)
+        engine = self.engines.get(key)
+        if engine is None:
+            engine = self.engines[key] = PresenceEngine(self.loop_thread)
+            engine.listeners.extend(self.listeners)
+            engine.start()
+            engine.publish(self.snapshot)
+            if self.rotation_profiles:
+                engine.rotation.start(self.rotation_profiles)
+        return engine
+
+    def remove(self, key):
+        """Ferme et retire une connexion"""
+        engine = self.engines.pop(key, None)
+        if engine:
+            engine.disconnect()
+            engine.stop()
+
+    def connect(self, connections, retry=False):
+        """Connecte la liste de (client_id, pipe), retire les autres connexions
+
+        Retourne un Future dont le résultat est la liste de (clé, erreur ou None).
+        """
+        keys = [(str(client_id), pipe) for client_id, pipe in connections]
+        for key in [key for key in self.engines if key not in keys]:
+            self.remove(key)
+        for client_id, pipe in keys:
+            self.add(client_id, pipe)
+        return self.loop_thread.submit(self._connect_all(keys, retry))
+
+    async def _connect_all(self, keys, retry=False):
+        # Handshakes en parallèle : une instance absente ne retarde pas les autres
+        keys = [key for key in keys if self.engines[key].target is None]
+        results = await asyncio.gather(*(self.engines[key]._connect(*key, retry) for key in keys),
+                                       return_exceptions=True)
+        return [(key, error) for key, error in zip(keys, results)]
+
+    def disconnect(self):
+        """Ferme toutes les connexions, retourne la liste des Futures"""
+        return [engine.disconnect() for engine in self.engines.values()]
+
+    def publish(self, snapshot, immediate=False):
+        """Publie la même présence sur toutes les connexions"""
+        self.snapshot = snapshot
+        for engine in self.engines.values():
+            engine.publish(snapshot, immediate)
+
+    def start_rotation(self, profiles):
+        """Démarre la rotation de profils sur toutes les connexions"""
+        self.rotation_profiles = tuple(profiles)
+        for engine in self.engines.values():
+            engine.rotation.start(self.rotation_profiles)
+
+    def stop_rotation(self):
+        self.rotation_profiles = ()
+        for engine in self.engines.values():
+            engine.rotation.stop()
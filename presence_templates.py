@@ -0,0 +1,201 @@
+"""
+Modèles de présence dynamiques
+Les champs peuvent contenir des variables ({time}, {uptime}, {counter}...)
+compilées une seule fois ; seuls les champs dont une variable a changé
+sont recalculés à chaque tick.
+"""
+
+import datetime
+import functools
+import string
+import time
+
+# Période de réévaluation des variables (secondes), compatible avec le quota Discord
+TEMPLATE_TICK = 15.0
+
+# Format par défaut des variables de date / heure
+DEFAULT_SPECS = {
+    'time': '%H:%M',
+    'date': '%d/%m/%Y',
+}
+
+_formatter = string.Formatter()
+
+
+class CompiledTemplate:
+    """Modèle découpé une fois pour toutes en (texte fixe, variable)
+
+    Chaque variable est identifiée par une clé (nom, conversion, format) :
+    deux champs utilisant `{time}` partagent la même valeur calculée.
+    `{{` et `}}` donnent des accolades littérales, avec ou sans variables.
+    """
+
+    __slots__ = ('source', 'parts', 'keys', 'variables', 'text')
+
+    def __init__(self, source):
+        self.source = source
+        try:
+            parsed = list(_formatter.parse(source))
+        except ValueError:
+            # Accolade isolée : texte brut
+            parsed = [(source, None, None, None)]
+
+        parts = []
+        for literal, name, spec, conversion in parsed:
+            if literal:
+                parts.append((literal, None))
+            if name is not None:
+                key = (name, conversion or '', spec or DEFAULT_SPECS.get(name, ''))
+                parts.append(('', key))
+        self.parts = tuple(parts)
+        self.keys = frozenset(key for _, key in parts if key is not None)
+        self.variables = frozenset(key[0] for key in self.keys)
+        # Texte sans variable, accolades doublées déjà remplacées
+        self.text = ''.join(literal for literal, _ in parts)
+
+    @property
+    def dynamic(self):
+        return bool(self.keys)
+
+    def render(self, texts):
+        """Assemble le texte à partir des valeurs formatées {clé: texte}"""
+        if not self.keys:
+            return self.text
+        return ''.join(texts[key] if key is not None else literal for literal, key in self.parts)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(source):
+    """Compile (avec cache) le modèle d'un champ"""
+    return CompiledTemplate(source)
+
+
+def format_duration(seconds):
+    """Durée lisible : 5 min, 2h05..."""
+    minutes = int(seconds) // 60
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60}h{minutes % 60:02d}"
+
+
+class TemplateContext:
+    """Fournisseurs de variables des modèles
+
+    `register(nom, fonction, ttl)` ajoute une variable personnalisée ; sa
+    valeur est gardée `ttl` secondes avant d'appeler à nouveau la fonction.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ticks = 0
+        self._providers = {}
+        self._cache = {}
+        self.register('time', datetime.datetime.now)
+        self.register('date', datetime.date.today)
+        self.register('uptime', lambda: format_duration(time.monotonic() - self.started_at))
+        self.register('counter', lambda: self.ticks)
+
+    def register(self, name, func, ttl=0.0):
+        """Déclare (ou remplace) une variable"""
+        self._providers[name] = (func, ttl)
+        self._cache.pop(name, None)
+
+    def provides(self, name):
+        """Variable connue : sa valeur peut changer d'un tick à l'autre"""
+        return name in self._providers
+
+    def tick(self):
+        """Passe au tick suivant (variable {counter})"""
+        self.ticks += 1
+
+    def value(self, name, now):
+        entry = self._providers.get(name)
+        if entry is None:
+            return None
+        func, ttl = entry
+        cached = self._cache.get(name)
+        if cached and now < cached[0]:
+            return cached[1]
+        value = func()
+        if ttl:
+            self._cache[name] = (now + ttl, value)
+        return value
+
+    def evaluate(self, keys):
+        """Formate les variables demandées, chaque fournisseur n'est appelé qu'une fois"""
+        now = time.monotonic()
+        values = {}
+        texts = {}
+        for key in keys:
+            name, conversion, spec = key
+            if name not in values:
+                try:
+                    values[name] = self.value(name, now)
+                except Exception as e:
+                    values[name] = f"<{name}: {e}>"
+            value = values[name]
+            if value is None:
+                # Variable inconnue : laissée telle quelle
+                texts[key] = '{' + name + '}'
+                continue
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            try:
+                texts[key] = format(value, spec)
+            except (ValueError, TypeError):
+                texts[key] = str(value)
+        return texts
+
+
+class PresenceTemplate:
+    """Photo de présence dont les champs texte sont des modèles
+
+    `render()` ne recalcule que les champs dépendant d'une variable dont
+    le texte a changé depuis le rendu précédent.
+    """
+
+    def __init__(self, snapshot, context, fields):
+        self.source = snapshot
+        self.context = context
+        self.templates = {field: compile_template(getattr(snapshot, field)) for field in fields}
+        self.dynamic_fields = {field: template for field, template in self.templates.items()
+                               if template.dynamic}
+        # Champs sans variable mais avec des accolades échappées
+        self.escaped_fields = {field: template for field, template in self.templates.items()
+                               if not template.dynamic and template.text != template.source}
+        self.keys = frozenset().union(*(t.keys for t in self.dynamic_fields.values()))
+        self.texts = {}
+        self.rendered = None
+
+    @property
+    def dynamic(self):
+        return bool(self.dynamic_fields)
+
+    @property
+    def time_dependent(self):
+        """Au moins une variable connue : le rendu doit être réévalué périodiquement
+
+        Les variables inconnues restent du texte fixe et ne justifient pas de tick.
+        """
+        return any(self.context.provides(key[0]) for key in self.keys)
+
+    def render(self):
+        """Retourne la photo rendue, ou None si rien n'a changé depuis le dernier rendu"""
+        if self.rendered is None:
+            self.texts = self.context.evaluate(self.keys)
+            self.rendered = self.source._replace(**{
+                field: template.render(self.texts)
+                for fields in (self.dynamic_fields, self.escaped_fields) for field, template in fields.items()})
+            return self.rendered
+
+        texts = self.context.evaluate(self.keys)
+        changed = {key for key, text in texts.items() if self.texts.get(key) != text}
+        if not changed:
+            return None
+        self.texts = texts
+
+        # Seuls les champs concernés sont réassemblés
+        updates = {field: template.render(texts) for field, template in self.dynamic_fields.items()
+                   if not template.keys.isdisjoint(changed)}
+        self.rendered = self.rendered._replace(**updates)
+        return self.rendered
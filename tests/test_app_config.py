@@ -0,0 +1,48 @@
+"""Configuration : écriture atomique, droits du fichier, durée de rotation"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+import app_config
+
+
+def mode_of(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="droits POSIX")
+def test_save_keeps_the_file_mode(tmp_path):
+    path = str(tmp_path / 'config.json')
+    app_config.save_config(app_config.DEFAULT_CONFIG, path)
+    assert mode_of(path) == app_config.CONFIG_FILE_MODE
+
+    os.chmod(path, 0o640)
+    app_config.save_config(dict(app_config.DEFAULT_CONFIG, details='Sur Discord'), path)
+    assert mode_of(path) == 0o640
+    assert app_config.load_config(path)['details'] == 'Sur Discord'
+    assert os.listdir(str(tmp_path)) == ['config.json']
+
+
+@pytest.mark.parametrize('value, expected', [
+    (30, 30), ('45', 45), (' 2,5 ', 2.5), (12.0, 12),
+])
+def test_rotation_interval_is_normalized(value, expected):
+    assert app_config.parse_rotation_interval(value) == expected
+
+
+@pytest.mark.parametrize('value', ['abc', '', None, 0, -5, 'nan', 'inf', True, [30]])
+def test_invalid_rotation_interval_falls_back_to_default(tmp_path, value):
+    path = str(tmp_path / 'config.json')
+    app_config.save_config({'rotation_interval': value}, path)
+    with pytest.raises(ValueError):
+        app_config.parse_rotation_interval(value)
+    assert app_config.load_config(path)['rotation_interval'] == app_config.DEFAULT_CONFIG['rotation_interval']
+
+
+def test_text_and_number_intervals_load_equal(tmp_path):
+    path = str(tmp_path / 'config.json')
+    app_config.save_config({'rotation_interval': '30'}, path)
+    assert app_config.load_config(path) == app_config.load_config(str(tmp_path / 'absent.json'))
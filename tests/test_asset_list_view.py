@@ -0,0 +1,82 @@
+"""Index par préfixe de la liste d'assets (sans affichage)"""
+
+from asset_list_view import REBUILD_THRESHOLD, PrefixIndex, VirtualAssetList
+from asset_store import AssetRecord
+
+
+def record(item_id, name):
+    return AssetRecord(item_id, name, f'{item_id}.png', None, '2024-01-01 00:00:00', None)
+
+
+def names_in_range(index, prefix):
+    lo, hi = index.prefix_range(prefix)
+    return [key for key, _ in index.keys[lo:hi]]
+
+
+def test_prefix_range_is_case_insensitive():
+    index = PrefixIndex()
+    for i, name in enumerate(['Logo', 'logo_dark', 'lobby', 'icon', 'LOGOUT']):
+        index.add(name, str(i))
+
+    assert names_in_range(index, 'LOG') == ['logo', 'logo_dark', 'logout']
+    assert names_in_range(index, 'lo') == ['lobby', 'logo', 'logo_dark', 'logout']
+    assert names_in_range(index, 'x') == []
+    assert index.prefix_range('') == (0, 5)
+
+
+def test_remove_only_drops_matching_entry():
+    index = PrefixIndex()
+    index.add('logo', '1')
+    index.add('logo', '2')
+    index.remove('logo', '1')
+    index.remove('logo', '3')
+    assert index.keys == [('logo', '2')]
+
+
+def test_rebuild_matches_incremental_index():
+    entries = [(f'asset_{i % 97}', str(i)) for i in range(500)]
+    incremental = PrefixIndex()
+    for name, item_id in entries:
+        incremental.add(name, item_id)
+    rebuilt = PrefixIndex()
+    rebuilt.rebuild(entries)
+    assert rebuilt.keys == incremental.keys
+
+
+def make_view():
+    # Liste sans widgets : seules les données sont testées
+    view = object.__new__(VirtualAssetList)
+    view.items = {}
+    view.index = PrefixIndex()
+    view.query = ''
+    view.selected_id = None
+    view.redraw = lambda: None
+    return view
+
+
+def test_bulk_load_sorts_once(monkeypatch):
+    view = make_view()
+    inserts = []
+    monkeypatch.setattr(view.index, 'add', lambda *args: inserts.append(args))
+
+    records = [record(str(i), f'asset_{(i * 7919) % 10000:05d}') for i in range(10000)]
+    view.set_items(records)
+
+    assert inserts == []
+    assert view.count() == 10000
+    assert view.index.keys == sorted(view.index.keys)
+
+
+def test_small_changes_are_applied_incrementally():
+    view = make_view()
+    view.set_items([record(str(i), f'asset_{i}') for i in range(REBUILD_THRESHOLD * 2)])
+    view.selected_id = '3'
+
+    records = [record(str(i), f'asset_{i}') for i in range(REBUILD_THRESHOLD * 2) if i != 3]
+    records.append(record('new', 'zebra'))
+    view.set_items(records)
+
+    assert view.selected_id is None
+    assert view.count() == REBUILD_THRESHOLD * 2
+    view.set_filter('zeb')
+    assert view.record_at(0).id == 'new'
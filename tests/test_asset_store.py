@@ -0,0 +1,91 @@
+"""Index des assets : ajout, déduplication par contenu, suppression"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from asset_store import AssetStore, copy_to_temp
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AssetStore(str(tmp_path / 'assets.db'), str(tmp_path / 'assets'), legacy_file=None)
+    yield store
+    store.close()
+
+
+def make_image(directory, name, content):
+    path = directory / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_same_content_shares_one_file(store, tmp_path):
+    first = store.add('a', make_image(tmp_path, 'a.png', b'same'))
+    second = store.add('b', make_image(tmp_path, 'b.PNG', b'same'))
+    other = store.add('c', make_image(tmp_path, 'c.png', b'other'))
+
+    assert first.local_path == second.local_path
+    assert first.content_hash == second.content_hash
+    assert other.local_path != first.local_path
+    assert sorted(os.listdir(store.assets_dir)) == sorted(
+        os.path.basename(path) for path in (first.local_path, other.local_path))
+
+
+def test_delete_keeps_shared_file_until_last_reference(store, tmp_path):
+    first = store.add('a', make_image(tmp_path, 'a.png', b'same'))
+    second = store.add('b', make_image(tmp_path, 'b.png', b'same'))
+
+    assert store.delete(first.id) == first
+    assert os.path.exists(second.local_path)
+    store.delete(second.id)
+    assert not os.path.exists(second.local_path)
+    assert store.delete(second.id) is None
+
+
+def test_add_many_deduplicates_within_batch(store, tmp_path):
+    items = []
+    for name, content in (('a', b'same'), ('b', b'same'), ('c', b'other')):
+        tmp, content_hash = copy_to_temp(make_image(tmp_path, f'{name}.png', content), store.assets_dir)
+        items.append((name, str(tmp_path / f'{name}.png'), tmp, content_hash))
+
+    records = store.add_many(items)
+
+    assert [record.name for record in store.list()] == ['a', 'b', 'c']
+    assert records[0].local_path == records[1].local_path
+    # Plus aucune copie temporaire
+    assert len(os.listdir(store.assets_dir)) == 2
+
+
+def test_failed_insert_releases_new_file(store, tmp_path):
+    store.conn.execute('CREATE TRIGGER refuse BEFORE INSERT ON assets BEGIN SELECT RAISE(ABORT, "refus"); END')
+    with pytest.raises(Exception):
+        store.add('a', make_image(tmp_path, 'a.png', b'data'))
+    assert os.listdir(store.assets_dir) == []
+
+
+def test_delete_during_add_of_same_content_keeps_file(store, tmp_path):
+    existing = store.add('a', make_image(tmp_path, 'a.png', b'same'))
+    placed = threading.Event()
+    place_blob = store.place_blob
+
+    def slow_place_blob(*args):
+        # Fichier partagé choisi, INSERT pas encore fait
+        path = place_blob(*args)
+        placed.set()
+        time.sleep(0.2)
+        return path
+
+    store.place_blob = slow_place_blob
+    result = {}
+    source = make_image(tmp_path, 'b.png', b'same')
+    adder = threading.Thread(target=lambda: result.update(record=store.add('b', source)))
+    adder.start()
+    placed.wait(5)
+    store.delete(existing.id)
+    adder.join()
+
+    assert result['record'].local_path == existing.local_path
+    assert os.path.exists(result['record'].local_path)
@@ -0,0 +1,169 @@
+"""Rate limits de la session REST, contre l'API Discord factice"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from discord_api import DiscordBotClient, RateLimitBucket, RateLimitedSession, route_key
+from mock_discord_api import APPLICATION_ID, MockDiscordAPI
+
+HEADERS = {'Authorization': 'Bot test.token'}
+
+
+@pytest.fixture
+def api():
+    server = MockDiscordAPI()
+    server.start()
+    yield server
+    server.stop()
+
+
+def get_application(session, api):
+    return session.request('GET', f'{api.api_base}/applications/{APPLICATION_ID}', headers=HEADERS)
+
+
+def rate_limit_headers(remaining, limit=5, reset_after=1.0):
+    return {'X-RateLimit-Limit': str(limit), 'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset-After': str(reset_after)}
+
+
+def test_route_key_keeps_major_parameters():
+    assert route_key('get', 'https://x/api/v10/applications/123') == 'GET /api/v10/applications/:id'
+    assert (route_key('POST', 'https://x/api/v10/channels/42/messages/7')
+            == 'POST /api/v10/channels/42/messages/:id')
+    assert route_key('GET', 'https://x/api/v10/guilds/9?with_counts=1') == 'GET /api/v10/guilds/9'
+
+
+def test_bucket_ignores_out_of_order_responses():
+    bucket = RateLimitBucket('route')
+    bucket.update(rate_limit_headers(3), now=0.0)
+    # Réponse d'une requête plus ancienne, arrivée après
+    bucket.update(rate_limit_headers(4), now=0.1)
+    assert bucket.remaining == 3
+
+
+def test_bucket_subtracts_inflight_requests():
+    bucket = RateLimitBucket('route')
+    bucket.inflight = 2
+    bucket.update(rate_limit_headers(4), now=0.0)
+    assert bucket.remaining == 2
+
+
+def test_bucket_accepts_new_window():
+    bucket = RateLimitBucket('route')
+    bucket.update(rate_limit_headers(0), now=0.0)
+    assert bucket.delay(0.5) == pytest.approx(0.5)
+    # Fenêtre suivante : le quota annoncé par Discord est repris tel quel
+    bucket.update(rate_limit_headers(4), now=1.5)
+    assert bucket.remaining == 4
+    assert bucket.delay(1.5) == 0.0
+
+
+def test_unknown_limits_allow_one_request_at_a_time():
+    bucket = RateLimitBucket('route')
+    assert bucket.delay(0.0) == 0.0
+    bucket.inflight = 1
+    assert bucket.delay(0.0) is None
+
+
+def test_session_waits_for_quota_instead_of_429(api):
+    api.limit, api.window = 2, 0.2
+    session = RateLimitedSession()
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = [response.status_code for response in
+                    executor.map(lambda _: get_application(session, api), range(6))]
+    elapsed = time.monotonic() - start
+    session.close()
+
+    assert statuses == [200] * 6
+    assert api.stats['throttled'] == 0
+    # 6 requêtes à 2 par fenêtre : au moins deux fenêtres d'attente
+    assert elapsed >= 0.35
+
+
+def test_session_retries_after_429(api):
+    api.throttle_every, api.retry_after = 2, 0.05
+    session = RateLimitedSession()
+    statuses = [get_application(session, api).status_code for _ in range(3)]
+    session.close()
+
+    assert statuses == [200] * 3
+    assert api.stats['throttled'] >= 1
+    assert api.stats['requests'] == 3 + api.stats['throttled']
+
+
+def test_session_gives_up_after_max_retries(api):
+    api.throttle_every, api.retry_after = 1, 0.01
+    session = RateLimitedSession(max_retries=2)
+    response = get_application(session, api)
+    session.close()
+
+    assert response.status_code == 429
+    assert api.stats['requests'] == 3
+
+
+def test_bucket_state_reports_discord_bucket(api):
+    api.limit = 5
+    session = RateLimitedSession()
+    get_application(session, api)
+    state = session.bucket_state()
+    session.close()
+
+    [bucket] = state['buckets']
+    assert bucket['limit'] == 5
+    assert bucket['remaining'] == 4
+    assert bucket['routes'] == ['GET /api/v10/applications/:id']
+
+
+def test_concurrent_identity_misses_share_one_call(api):
+    api.latency = 0.05
+    client = DiscordBotClient('test.token', api_base=api.api_base)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        ids = list(executor.map(lambda _: client.get_current_application()['id'], range(4)))
+    client.session.close()
+
+    assert ids == [APPLICATION_ID] * 4
+    assert api.stats['requests'] == 1
+
+
+def test_identity_cache_follows_token(api):
+    client = DiscordBotClient('test.token', api_base=api.api_base)
+    client.get_current_application()
+    client.get_current_application()
+    client.token = 'other.token'
+    assert client.cached_current_application() is None
+    client.get_current_application()
+    client.session.close()
+
+    assert api.stats['requests'] == 2
+
+
+def test_429_backoff_survives_concurrent_success():
+    bucket = RateLimitBucket('route')
+    bucket.update(rate_limit_headers(900, limit=1000, reset_after=1.0), now=0.0)
+    # 429 (retry_after 50 ms) puis une réponse 200 concurrente de la même fenêtre
+    bucket.retry_until = 0.05
+    bucket.update(rate_limit_headers(899, limit=1000, reset_after=1.0), now=0.01)
+
+    assert bucket.delay(0.02) == pytest.approx(0.03)
+    assert bucket.delay(0.06) == 0.0
+    assert bucket.remaining == 899
+
+
+def test_injected_429_only_pauses_for_retry_after(api):
+    api.limit, api.window = 1000, 1.0
+    api.throttle_every, api.retry_after = 5, 0.05
+    session = RateLimitedSession()
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = [response.status_code for response in
+                    executor.map(lambda _: get_application(session, api), range(40))]
+    elapsed = time.monotonic() - start
+    session.close()
+
+    assert statuses == [200] * 40
+    assert api.stats['throttled'] >= 8
+    # Environ 10 pauses de 50 ms, pas une fenêtre complète (1 s) par 429
+    assert elapsed < 0.9
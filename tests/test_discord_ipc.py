@@ -0,0 +1,97 @@
+"""Client IPC asynchrone, contre des serveurs factices"""
+
+import asyncio
+
+import pytest
+
+from discord_ipc import HEADER, OP_FRAME, AsyncDiscordIPC, DiscordIPCError, build_activity
+from fake_discord_ipc import FakeDiscordServer
+
+
+@pytest.fixture
+def ipc_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_build_activity_groups_fields():
+    assert build_activity({'details': 'd', 'state': '', 'start': 10, 'large_image': 'logo'}) == {
+        'details': 'd', 'timestamps': {'start': 10}, 'assets': {'large_image': 'logo'}}
+    assert build_activity({}) is None
+
+
+def test_set_activity_roundtrip(ipc_dir):
+    server = FakeDiscordServer(str(ipc_dir))
+    server.start()
+
+    async def scenario():
+        client = AsyncDiscordIPC('123', pipe=0)
+        await client.connect()
+        await asyncio.gather(*(client.set_activity({'details': str(i)}) for i in range(3)))
+        await client.close()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        server.stop()
+    assert sorted(activity['details'] for _, activity in server.received) == ['0', '1', '2']
+
+
+def test_failed_handshake_closes_socket(ipc_dir):
+    async def scenario():
+        closed = asyncio.Event()
+
+        async def handle(reader, writer):
+            await reader.readexactly(HEADER.size)
+            # Réponse illisible au handshake
+            writer.write(HEADER.pack(OP_FRAME, 3) + b'{{{')
+            await writer.drain()
+            # Le client doit fermer le socket : la lecture se termine alors
+            await reader.read()
+            closed.set()
+
+        server = await asyncio.start_unix_server(handle, str(ipc_dir / 'discord-ipc-0'))
+        client = AsyncDiscordIPC('123', pipe=0)
+        with pytest.raises(ValueError):
+            await client.connect()
+        await asyncio.wait_for(closed.wait(), 1.0)
+        assert not client.connected
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_connect_without_discord(ipc_dir):
+    with pytest.raises(DiscordIPCError):
+        asyncio.run(AsyncDiscordIPC('123', pipe=0).connect())
+
+
+def test_lost_connection_closes_socket(ipc_dir):
+    async def scenario():
+        closed = asyncio.Event()
+
+        async def handle(reader, writer):
+            op, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+            await reader.readexactly(length)
+            ready = b'{"cmd":"DISPATCH","evt":"READY","nonce":null,"data":{}}'
+            writer.write(HEADER.pack(OP_FRAME, len(ready)) + ready)
+            # Trame illisible après le handshake : le client abandonne la connexion
+            writer.write(HEADER.pack(OP_FRAME, 3) + b'{{{')
+            await writer.drain()
+            await reader.read()
+            closed.set()
+
+        server = await asyncio.start_unix_server(handle, str(ipc_dir / 'discord-ipc-0'))
+        client = AsyncDiscordIPC('123', pipe=0)
+        await client.connect()
+        await asyncio.wait_for(client.wait_closed(), 1.0)
+        await asyncio.wait_for(closed.wait(), 1.0)
+        assert not client.connected
+        with pytest.raises(DiscordIPCError):
+            await client.set_activity({'details': 'x'})
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())
@@ -0,0 +1,159 @@
+"""Moteur de présence : connexions, modèle, quota"""
+
+import asyncio
+import time
+import types
+
+import pytest
+
+from discord_ipc import EventLoopThread
+from fake_discord_ipc import FakeDiscordServer
+from presence_engine import (PRESENCE_RATE_LIMITED, STATE_CONNECTED, PresenceEngine, PresenceHub,
+                             PresenceModel, PresencePusher, PresenceRotation, PresenceSnapshot,
+                             RateLimiter, backoff_delay, parse_connections)
+
+
+@pytest.fixture
+def discord(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    server = FakeDiscordServer(str(tmp_path))
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_parse_connections():
+    assert parse_connections('1, 2', '') == [('1', None), ('2', None)]
+    assert parse_connections('1', '0,3') == [('1', 0), ('1', 3)]
+    assert parse_connections('', '0') == []
+    with pytest.raises(ValueError):
+        parse_connections('1', '12')
+
+
+def test_backoff_delay_is_bounded():
+    assert backoff_delay(0) == 0.0
+    for attempt in range(1, 12):
+        delay = backoff_delay(attempt, base=1.0, maximum=60.0)
+        assert 0.5 * min(60.0, 2 ** (attempt - 1)) <= delay <= min(60.0, 2 ** (attempt - 1))
+
+
+def test_shutdown_closes_connection_before_stopping_loop(discord):
+    hub = PresenceHub()
+    hub.start()
+    hub.publish(PresenceSnapshot.from_dict({'details': 'test'}))
+    [(key, error)] = hub.connect([('123', 0)]).result(5)
+    assert error is None
+    assert hub.engines[key].state == STATE_CONNECTED
+    assert discord.wait_for(lambda: discord.received, 5)
+
+    hub.shutdown()
+
+    # Socket fermé : Discord retire la présence
+    assert discord.wait_for(lambda: not discord._writers, 1.0)
+
+
+def snapshot(details, show_time=False):
+    return PresenceSnapshot.from_dict({'details': details, 'show_time': show_time})
+
+
+def test_payload_keeps_start_while_time_is_shown(monkeypatch):
+    model = PresenceModel()
+    monkeypatch.setattr(time, 'time', lambda: 1000.0)
+    first, _ = model.payload_for(snapshot('a', show_time=True))
+    monkeypatch.setattr(time, 'time', lambda: 2000.0)
+    second, _ = model.payload_for(snapshot('b', show_time=True))
+
+    assert first == {'details': 'a', 'start': 1000}
+    assert second == {'details': 'b', 'start': 1000}
+    assert model.payload_for(snapshot('c'))[0] == {'details': 'c'}
+    assert model.start_timestamp is None
+
+
+def test_prepare_does_not_touch_timer(monkeypatch):
+    model = PresenceModel()
+    monkeypatch.setattr(time, 'time', lambda: 1000.0)
+    model.payload_for(snapshot('live', show_time=True))
+
+    # Précalcul d'un profil sans chrono pendant que le chrono tourne
+    monkeypatch.setattr(time, 'time', lambda: 2000.0)
+    model.prepare(snapshot('other'))
+    model.prepare(snapshot('timed', show_time=True))
+
+    assert model.start_timestamp == 1000
+    assert model.payload_for(snapshot('timed', show_time=True))[0]['start'] == 1000
+
+
+def test_prepared_payload_is_reused_and_digest_tracks_start(monkeypatch):
+    model = PresenceModel()
+    timed = snapshot('a', show_time=True)
+    assert model.prepare(timed) is model.prepare(timed)
+
+    monkeypatch.setattr(time, 'time', lambda: 1000.0)
+    payload, digest = model.payload_for(timed)
+    assert digest == PresenceModel.payload_hash(payload)
+    model.start_timestamp = None
+    monkeypatch.setattr(time, 'time', lambda: 2000.0)
+    assert model.payload_for(timed)[1] != digest
+
+
+def test_rotation_precompute_keeps_live_timer(monkeypatch):
+    published = []
+    engine = types.SimpleNamespace(
+        model=PresenceModel(),
+        publish=lambda snapshot, immediate=False: published.append(snapshot),
+        loop_thread=types.SimpleNamespace(loop=types.SimpleNamespace(call_later=lambda *args: None)))
+    monkeypatch.setattr(time, 'time', lambda: 1000.0)
+    engine.model.payload_for(snapshot('live', show_time=True))
+
+    rotation = PresenceRotation(engine, min_interval=0)
+    rotation._start(((snapshot('timed', show_time=True), 5), (snapshot('plain'), 5)))
+
+    assert published == [snapshot('timed', show_time=True)]
+    assert engine.model.start_timestamp == 1000
+
+
+def tick_armed(engine):
+    async def read():
+        return engine._tick_handle is not None
+    return engine.loop_thread.submit(read()).result(1)
+
+
+def test_tick_only_runs_for_time_dependent_templates():
+    engine = PresenceEngine(template_tick=60)
+    engine.start()
+    try:
+        engine.publish(snapshot('Static {{text}}'))
+        assert not tick_armed(engine)
+        engine.publish(snapshot('Since {uptime}'))
+        assert tick_armed(engine)
+        engine.publish(snapshot('Unknown {nothing}'))
+        assert not tick_armed(engine)
+    finally:
+        engine.stop()
+
+
+def test_rate_limited_counts_each_deferred_send_once():
+    loop_thread = EventLoopThread()
+    loop_thread.start()
+    limiter = RateLimiter(max_calls=1, period=60)
+    limiter.record()
+    sent = []
+
+    async def send():
+        sent.append(True)
+        return True
+
+    pusher = PresencePusher(loop_thread, send, debounce=0, rate_limiter=limiter)
+    pusher.start()
+    counter = PRESENCE_RATE_LIMITED.labels()
+    before = counter.value
+    try:
+        # Saisie continue pendant que le quota est épuisé
+        for _ in range(20):
+            pusher.notify()
+        loop_thread.submit(asyncio.sleep(0.05)).result(1)
+        assert counter.value - before == 1
+        assert sent == []
+    finally:
+        pusher.stop()
+        loop_thread.stop()
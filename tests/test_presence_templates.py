@@ -0,0 +1,65 @@
+"""Modèles de présence : compilation, échappement, rendu incrémental"""
+
+from presence_engine import TEMPLATE_FIELDS, PresenceSnapshot
+from presence_templates import CompiledTemplate, PresenceTemplate, TemplateContext, format_duration
+
+
+def make_context(**values):
+    context = TemplateContext()
+    for name, value in values.items():
+        context.register(name, lambda value=value: value[0] if isinstance(value, list) else value)
+    return context
+
+
+def render(fields, context=None):
+    snapshot = PresenceSnapshot.from_dict(fields)
+    return PresenceTemplate(snapshot, context or make_context(), TEMPLATE_FIELDS).render()
+
+
+def test_escaped_braces_without_variables_are_unescaped():
+    template = CompiledTemplate('Score {{final}}')
+    assert not template.dynamic
+    assert template.render({}) == 'Score {final}'
+    assert render({'details': 'Score {{final}}'}).details == 'Score {final}'
+
+
+def test_escaped_braces_with_variables_are_unescaped():
+    rendered = render({'details': '{{{game}}}'}, make_context(game='Chess'))
+    assert rendered.details == '{Chess}'
+
+
+def test_isolated_brace_is_plain_text():
+    assert render({'details': 'a { b'}).details == 'a { b'
+
+
+def test_unknown_variable_kept_and_not_time_dependent():
+    snapshot = PresenceSnapshot.from_dict({'details': 'Hello {nobody}'})
+    template = PresenceTemplate(snapshot, TemplateContext(), TEMPLATE_FIELDS)
+    assert template.render().details == 'Hello {nobody}'
+    assert template.dynamic
+    assert not template.time_dependent
+
+
+def test_format_spec_and_conversion():
+    context = make_context(score=3.14159, name='bob')
+    rendered = render({'details': '{score:.1f}', 'state': '{name!r}'}, context)
+    assert (rendered.details, rendered.state) == ('3.1', "'bob'")
+
+
+def test_only_changed_fields_rerender():
+    value = ['a']
+    context = make_context(level=value)
+    snapshot = PresenceSnapshot.from_dict({'details': 'Level {level}', 'state': 'Up {uptime}'})
+    template = PresenceTemplate(snapshot, context, TEMPLATE_FIELDS)
+    assert template.render().details == 'Level a'
+    assert template.render() is None
+
+    value[0] = 'b'
+    rendered = template.render()
+    assert rendered.details == 'Level b'
+    assert rendered.state == template.rendered.state
+
+
+def test_format_duration():
+    assert format_duration(59) == '0 min'
+    assert format_duration(125 * 60) == '2h05'
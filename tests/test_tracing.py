@@ -0,0 +1,110 @@
+"""Traces : spans, pistes par tâche asyncio, export Chrome"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from tracing import Tracer
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    tracer.enable()
+    return tracer
+
+
+def complete_events(tracer):
+    return [event for event in tracer.chrome_events() if event['ph'] == 'X']
+
+
+def assert_nested(events):
+    """Événements « X » d'une même piste : imbriqués ou disjoints"""
+    by_track = {}
+    for event in events:
+        by_track.setdefault(event['tid'], []).append((event['ts'], event['ts'] + event['dur']))
+    for spans in by_track.values():
+        for start, end in spans:
+            for other_start, other_end in spans:
+                overlap = start < other_start < end
+                assert not overlap or other_end <= end
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span('ignored') as span:
+        span.set(value=1)
+    assert not tracer.events
+
+
+def test_span_records_args_and_errors(tracer):
+    with pytest.raises(KeyError):
+        with tracer.span('lookup', 'io', key='a') as span:
+            span.set(size=3)
+            raise KeyError('a')
+    [event] = complete_events(tracer)
+    assert event['name'] == 'lookup'
+    assert event['args'] == {'key': 'a', 'size': 3, 'error': 'KeyError'}
+
+
+def test_interleaved_coroutines_get_their_own_tracks(tracer):
+    @tracer.traced('update', 'presence')
+    async def update(delay):
+        with tracer.span('set_activity', 'ipc'):
+            await asyncio.sleep(delay)
+
+    async def scenario():
+        # Envois en parallèle sur la même boucle : les spans se chevauchent
+        await asyncio.gather(update(0.03), update(0.01), update(0.02))
+
+    asyncio.run(scenario())
+    events = complete_events(tracer)
+
+    assert len(events) == 6
+    tracks = {event['tid'] for event in events}
+    assert len(tracks) == 3
+    assert threading.get_ident() not in tracks
+    for track in tracks:
+        names = sorted(event['name'] for event in events if event['tid'] == track)
+        assert names == ['set_activity', 'update']
+    assert_nested(events)
+
+
+def test_export_names_every_track(tracer, tmp_path):
+    async def task():
+        with tracer.span('in_task'):
+            await asyncio.sleep(0)
+
+    with tracer.span('in_thread'):
+        asyncio.run(task())
+
+    data = json.loads(open(tracer.export(str(tmp_path / 'trace.json')), encoding='utf-8').read())
+    names = {event['tid']: event['args']['name'] for event in data['traceEvents'] if event['ph'] == 'M'}
+    for event in data['traceEvents']:
+        if event['ph'] == 'X':
+            assert event['tid'] in names
+    assert any('task' in name for name in names.values())
+
+
+def test_finished_tasks_give_their_track_back():
+    tracer = Tracer(size=100)
+    tracer.enable()
+
+    async def send():
+        with tracer.span('send'):
+            await asyncio.sleep(0)
+
+    async def scenario():
+        # Une tâche par envoi, comme PresencePusher
+        for _ in range(50):
+            await asyncio.gather(*(asyncio.ensure_future(send()) for _ in range(100)))
+
+    asyncio.run(scenario())
+
+    assert len(tracer.thread_names) <= 101
+    events = tracer.chrome_events()
+    metadata = [event for event in events if event['ph'] == 'M']
+    assert len(events) - len(metadata) == 100
+    assert {event['tid'] for event in metadata} == {event['tid'] for event in events if event['ph'] == 'X'}
@@ -0,0 +1,50 @@
+"""Surveillance de l'interface : signalement des blocages"""
+
+import logging
+import time
+
+from ui_watchdog import StallDetector
+
+
+class FakeRoot:
+    """Boucle Tk factice : les battements sont appelés à la main"""
+
+    def after(self, ms, callback):
+        return 'after#1'
+
+    def after_cancel(self, after_id):
+        pass
+
+
+def hang(seconds):
+    time.sleep(seconds)
+
+
+def stall_messages(caplog):
+    return [record.getMessage() for record in caplog.records if record.name == 'ui_watchdog']
+
+
+def test_stall_is_reported_while_the_ui_is_still_blocked(caplog):
+    caplog.set_level(logging.WARNING, logger='ui_watchdog')
+    detector = StallDetector(FakeRoot(), threshold=0.05, interval=0.01)
+    detector.start()
+    try:
+        # Le thread « Tk » (celui du test) ne bat plus : signalé sans attendre le battement suivant
+        hang(0.3)
+        messages = stall_messages(caplog)
+        assert len(messages) == 1
+        assert messages[0].startswith("Interface bloquée depuis")
+        assert 'hang' in messages[0]
+
+        detector._beat()
+        messages = stall_messages(caplog)
+        assert len(messages) == 2
+        assert messages[1].startswith("Interface débloquée après")
+        assert detector.stalls == 1
+
+        # Nouveau blocage : nouveau signalement
+        hang(0.15)
+        assert len(stall_messages(caplog)) == 3
+    finally:
+        detector.stop()
+        detector._thread.join()
@@ -0,0 +1,118 @@
+"""
+Miniatures des assets
+Génération paresseuse, cache disque par empreinte et cache mémoire LRU
+"""
+
+import collections
+import os
+import tempfile
+import tkinter as tk
+
+THUMBNAIL_DIR = os.path.join('assets', '.thumbnails')
+THUMBNAIL_SIZE = 64
+
+# Nombre maximum de PhotoImage gardées en mémoire
+MEMORY_CACHE_SIZE = 256
+
+
+def thumbnail_path(cache_dir, content_hash, size=THUMBNAIL_SIZE):
+    """Chemin de la miniature d'une empreinte pour une taille donnée"""
+    return os.path.join(cache_dir, f"{content_hash}_{size}.png")
+
+
+def render_thumbnail(source_path, dest_path, size):
+    """Génère la miniature PNG d'une image (écriture atomique)"""
+    # Pillow n'est chargé qu'à la première miniature à générer
+    from PIL import Image
+
+    with Image.open(source_path) as img:
+        # JPEG : décodage directement à une résolution réduite
+        img.draft('RGB', (size * 2, size * 2))
+        # reducing_gap : réduction entière rapide avant le rééchantillonnage fin
+        img.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA')
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, 'PNG')
+            os.replace(tmp_path, dest_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    return dest_path
+
+
+class ThumbnailCache:
+    """Cache des miniatures : disque (par empreinte et taille) puis mémoire (LRU)
+
+    Le décodage des images se fait dans le pool de workers, seule la
+    création de la PhotoImage a lieu dans le thread Tk.
+    """
+
+    def __init__(self, task_runner, cache_dir=THUMBNAIL_DIR, size=THUMBNAIL_SIZE,
+                 max_images=MEMORY_CACHE_SIZE):
+        self.task_runner = task_runner
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_images = max_images
+        self._images = collections.OrderedDict()
+        self._pending = {}
+        self._failed = set()
+
+    def thumbnail_path(self, content_hash):
+        return thumbnail_path(self.cache_dir, content_hash, self.size)
+
+    def ensure_file(self, content_hash, source_path):
+        """Retourne le chemin de la miniature, générée si absente (thread de fond)"""
+        path = self.thumbnail_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            render_thumbnail(source_path, path, self.size)
+        return path
+
+    def get_cached(self, content_hash):
+        """PhotoImage déjà en mémoire (ou None)"""
+        image = self._images.get(content_hash)
+        if image is not None:
+            self._images.move_to_end(content_hash)
+        return image
+
+    def request(self, content_hash, source_path, callback):
+        """Appelle `callback(photo)` dans le thread Tk dès que la miniature est prête"""
+        image = self.get_cached(content_hash)
+        if image is not None:
+            callback(image)
+            return
+        if content_hash in self._failed:
+            return
+
+        # Une seule génération par empreinte, même si plusieurs lignes la demandent
+        if content_hash in self._pending:
+            self._pending[content_hash].append(callback)
+            return
+        self._pending[content_hash] = [callback]
+
+        self.task_runner.submit("Miniature", self.ensure_file, content_hash, source_path,
+                                on_success=lambda path: self._on_ready(content_hash, path),
+                                on_error=lambda e: self._on_error(content_hash, e))
+
+    def _on_ready(self, content_hash, path):
+        image = tk.PhotoImage(file=path)
+        self._images[content_hash] = image
+        while len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+
+        for callback in self._pending.pop(content_hash, []):
+            callback(image)
+
+    def _on_error(self, content_hash, error):
+        self._pending.pop(content_hash, None)
+        # Ne pas retenter à chaque affichage une image illisible
+        self._failed.add(content_hash)
+        print(f"Erreur miniature: {error}")
+
+    def clear(self):
+        """Vide le cache mémoire"""
+        self._images.clear()
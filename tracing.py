@@ -0,0 +1,230 @@
+"""
+Traces d'exécution
+Spans (début, durée, thread) gardés dans un tampon circulaire et
+exportables au format Chrome trace-event JSON (chrome://tracing, Perfetto)
+
+Désactivé par défaut : un span ne coûte alors qu'un test de booléen.
+
+Les événements « X » d'un même thread doivent s'imbriquer. Dans une boucle
+asyncio, les coroutines s'entrelacent : chaque tâche a donc sa propre piste
+(tid synthétique nommée d'après le thread et la coroutine). Une piste est
+rendue à la fin de sa tâche et reprise par la suivante de la même coroutine :
+leur nombre reste celui des tâches simultanées, pas des tâches créées.
+
+    with tracing.span('config.save', 'io'):
+        ...
+
+    @tracing.traced('presence.update', 'ipc')
+    async def update_presence(self): ...
+"""
+
+import asyncio
+import collections
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+
+# Nombre de spans gardés (les plus anciens sont oubliés)
+TRACE_BUFFER_SIZE = 20000
+
+# Premier tid des pistes de tâches asyncio : au-delà des identifiants de
+# threads, en restant exact en JavaScript (< 2**53)
+TASK_TRACK_BASE = 1 << 52
+
+
+class Span:
+    """Span en cours ; `set()` ajoute des arguments visibles dans la trace"""
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start', 'track')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+        self.track = None
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        # Piste prise dès le début : elle reste à la tâche tant que le span est ouvert
+        self.track = self.tracer._track()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter(), self.args,
+                           self.track)
+        return False
+
+
+class NullSpan:
+    """Span inactif (traces désactivées)"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Collecte des spans de tous les threads"""
+
+    def __init__(self, size=TRACE_BUFFER_SIZE):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.events = collections.deque(maxlen=size)
+        self.thread_names = {}
+        self._task_tracks = weakref.WeakKeyDictionary()
+        # Pistes de tâches par (thread, coroutine) : {clé: [tid de chaque place]}
+        # et places occupées par une tâche en cours
+        self._task_slots = {}
+        self._busy_slots = {}
+        self._track_ids = itertools.count(TASK_TRACK_BASE)
+        self._lock = threading.Lock()
+
+    def enable(self, size=None):
+        """Active la collecte (en vidant le tampon si sa taille change)"""
+        if size and size != self.events.maxlen:
+            self.events = collections.deque(maxlen=size)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events.clear()
+
+    def span(self, name, category='app', **args):
+        """Context manager mesurant le bloc"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def _track(self):
+        """Piste de l'appelant : la tâche asyncio en cours, sinon le thread"""
+        thread = threading.current_thread()
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            # Pas de boucle asyncio dans ce thread
+            task = None
+        if task is None:
+            if thread.ident not in self.thread_names:
+                self.thread_names[thread.ident] = thread.name
+            return thread.ident
+
+        track = self._task_tracks.get(task)
+        if track is None:
+            track = self._task_tracks[task] = self._acquire_track(task, thread)
+        return track
+
+    def _acquire_track(self, task, thread):
+        """Première place libre de la coroutine, rendue à la fin de la tâche"""
+        coro = getattr(task, 'get_coro', lambda: None)()
+        label = getattr(coro, '__qualname__', None) or 'task'
+        key = (thread.name, label)
+        with self._lock:
+            tracks = self._task_slots.setdefault(key, [])
+            busy = self._busy_slots.setdefault(key, set())
+            slot = 0
+            while slot in busy:
+                slot += 1
+            busy.add(slot)
+            if slot == len(tracks):
+                track = next(self._track_ids)
+                tracks.append(track)
+                self.thread_names[track] = f'{thread.name} · {label}' + (f' #{slot + 1}' if slot else '')
+            track = tracks[slot]
+        task.add_done_callback(functools.partial(self._release_track, key, slot))
+        return track
+
+    def _release_track(self, key, slot, task):
+        with self._lock:
+            self._busy_slots[key].discard(slot)
+
+    def record(self, name, category, start, end, args=None, track=None):
+        """Ajoute un span terminé (deque : ajout sans verrou, thread-safe)"""
+        if track is None:
+            track = self._track()
+        self.events.append((name, category, start, end, track, args))
+
+    def traced(self, name=None, category='app'):
+        """Décorateur : un span par appel (fonctions et coroutines)"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with Span(self, span_name, category, {}):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, span_name, category, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def chrome_events(self):
+        """Spans au format trace-event (événements complets « X », en microsecondes)"""
+        pid = os.getpid()
+        spans = list(self.events)
+        # Seules les pistes qui ont encore des spans dans le tampon sont nommées
+        tids = {span[4] for span in spans}
+        events = [{'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in list(self.thread_names.items()) if tid in tids]
+        for name, category, start, end, tid, args in spans:
+            event = {'ph': 'X', 'name': name, 'cat': category, 'pid': pid, 'tid': tid,
+                     'ts': round((start - self.origin) * 1e6, 3),
+                     'dur': round((end - start) * 1e6, 3)}
+            if args:
+                event['args'] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            events.append(event)
+        return events
+
+    def export(self, path):
+        """Écrit la trace JSON (ouvrable dans chrome://tracing ou ui.perfetto.dev)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.chrome_events(), 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+TRACER = Tracer()
+span = TRACER.span
+traced = TRACER.traced
+
+
+def enable(size=None):
+    """Active les traces du processus"""
+    TRACER.enable(size)
+
+
+def export(path):
+    """Exporte les traces du processus"""
+    return TRACER.export(path)
@@ -0,0 +1,72 @@
+"""
+Tâches de fond pour l'interface
+Pool borné de workers dont les résultats reviennent dans le thread Tk
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+
+class BackgroundTask:
+    """Tâche soumise au pool, annulable depuis l'interface"""
+
+    def __init__(self, description):
+        self.description = description
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Annule la tâche (son résultat sera ignoré si elle a déjà démarré)"""
+        self.cancelled = True
+        if self.future:
+            self.future.cancel()
+
+    def done(self):
+        return self.cancelled or (self.future is not None and self.future.done())
+
+
+class UITaskRunner:
+    """Exécute des fonctions bloquantes hors du thread de l'interface
+
+    Les callbacks `on_success(result)`, `on_error(exception)` et
+    `on_finish(task)` sont toujours appelés dans le thread Tk via
+    `root.after`.
+    """
+
+    def __init__(self, root, max_workers=4, name='ui-worker'):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def submit(self, description, func, *args, on_success=None, on_error=None, on_finish=None):
+        """Soumet `func(*args)` au pool, retourne la BackgroundTask"""
+        task = BackgroundTask(description)
+        task.future = self.executor.submit(self._run, description, func, args)
+        task.future.add_done_callback(
+            lambda f: self.root.after(0, self._dispatch, task, on_success, on_error, on_finish))
+        return task
+
+    @staticmethod
+    def _run(description, func, args):
+        with tracing.span(description, 'task'):
+            return func(*args)
+
+    @tracing.traced('ui.task_done', 'ui')
+    def _dispatch(self, task, on_success, on_error, on_finish):
+        if on_finish:
+            on_finish(task)
+        if task.cancelled:
+            return
+
+        error = task.future.exception()
+        if error is None:
+            if on_success:
+                on_success(task.future.result())
+        elif on_error:
+            on_error(error)
+        else:
+            print(f"Erreur tâche '{task.description}': {error}")
+
+    def shutdown(self):
+        """Arrête le pool sans attendre les requêtes en cours"""
+        self.executor.shutdown(wait=False)
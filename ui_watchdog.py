@@ -0,0 +1,138 @@
+"""
+Surveillance de la réactivité de l'interface
+Un battement `after()` dans la boucle Tk, surveillé depuis un thread de fond :
+quand il prend du retard, la pile du thread Tk est échantillonnée pour
+désigner la fonction qui bloque la boucle
+"""
+
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Intervalle du battement et seuil de blocage par défaut (secondes)
+HEARTBEAT_INTERVAL = 0.05
+STALL_THRESHOLD = 0.2
+
+# Fichiers de l'application : le coupable est la fonction la plus profonde qui en fait partie
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+UI_LAG = metrics.histogram('discord_ui_lag_seconds',
+                           "Retard du battement de la boucle Tk (réactivité de l'interface)",
+                           buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+UI_STALLS = metrics.counter('discord_ui_stalls_total',
+                            "Blocages de l'interface au-delà du seuil")
+
+
+def culprit(frame):
+    """Fonction de l'application en cours d'exécution, sinon la plus profonde de la pile"""
+    innermost = frame
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if os.path.dirname(filename) == APP_DIR and filename != os.path.abspath(__file__):
+            break
+        frame = frame.f_back
+    frame = frame or innermost
+    return f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
+
+
+class StallDetector:
+    """Détecte les blocages de la boucle Tk (`threshold` secondes sans battement)
+
+    Le thread de fond ne fait que lire l'heure du dernier battement et la pile
+    du thread Tk : aucun appel Tk hors du thread de l'interface. Il signale
+    le blocage dès le premier échantillon (une interface figée pour de bon ne
+    battra plus) ; le bilan (durée, coupable le plus échantillonné) suit au
+    battement d'après, dans le thread Tk.
+    """
+
+    def __init__(self, root, threshold=STALL_THRESHOLD, interval=HEARTBEAT_INTERVAL):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self.worst = 0.0
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._samples = collections.Counter()
+        # Battement après lequel le blocage en cours a déjà été signalé
+        self._stall_beat = None
+        self._lock = threading.Lock()
+        self._after = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """À appeler depuis le thread Tk"""
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._after = self.root.after(int(self.interval * 1000), self._beat)
+        self._thread = threading.Thread(target=self._watch, name='ui-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête la surveillance (avant la destruction de la fenêtre)"""
+        self._stop.set()
+        if self._after:
+            try:
+                self.root.after_cancel(self._after)
+            except Exception:
+                pass
+            self._after = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        expected = self._last_beat + self.interval
+        lag = max(0.0, now - expected)
+        self._last_beat = now
+        UI_LAG.labels().observe(lag)
+        if lag >= self.threshold:
+            self._report(expected, now, lag)
+        if not self._stop.is_set():
+            self._after = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _report(self, start, end, lag):
+        with self._lock:
+            samples, self._samples = self._samples, collections.Counter()
+        self.stalls += 1
+        self.worst = max(self.worst, lag)
+        UI_STALLS.labels().inc()
+
+        # Sans échantillon, le blocage a été plus court que la période de surveillance
+        name = samples.most_common(1)[0][0] if samples else "inconnu"
+        if tracing.TRACER.enabled:
+            tracing.TRACER.record('ui.stall', 'ui', start, end, {'culprit': name})
+        if samples:
+            logger.warning("Interface débloquée après %.0f ms : %s", lag * 1000, name)
+        else:
+            logger.warning("Interface bloquée %.0f ms : %s", lag * 1000, name)
+
+    def _watch(self):
+        # Échantillonne assez souvent pour voir plusieurs fois un blocage au seuil
+        period = min(self.interval, self.threshold / 4)
+        while not self._stop.wait(period):
+            last_beat = self._last_beat
+            lag = time.perf_counter() - last_beat - self.interval
+            if lag < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            name = culprit(frame)
+            with self._lock:
+                self._samples[name] += 1
+            if self._stall_beat != last_beat:
+                # Un seul signalement par blocage, avec la pile du thread Tk
+                self._stall_beat = last_beat
+                logger.warning("Interface bloquée depuis %.0f ms : %s\nPile du thread Tk :\n%s",
+                               lag * 1000, name, ''.join(traceback.format_stack(frame)))
+            del frame